@@ -26,6 +26,17 @@ class InvalidAudioFormatError(HTTPException):
         )
 
 
+class AudioCapacityError(HTTPException):
+    """Raised when every audio worker slot is busy (MAX_AUDIO_CONCURRENCY)"""
+
+    def __init__(self, retry_after: int = 5):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Audio analysis is at capacity. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 class TranscriptionError(HTTPException):
     """Raised when speech-to-text fails"""
 
@@ -0,0 +1,25 @@
+"""
+BlockSafe API Responses
+Response classes serialized directly by pydantic-core
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response that renders Pydantic models with their core serializer.
+
+    Returning an instance from an endpoint bypasses FastAPI's response_model
+    re-validation and jsonable_encoder walk; the model is serialized once in
+    Rust, straight to bytes. Non-model content falls back to the standard
+    JSON rendering.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
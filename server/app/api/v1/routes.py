@@ -3,43 +3,60 @@ BlockSafe API Routes
 Main API endpoints for scam analysis
 """
 
-from datetime import datetime, timezone
-from typing import Annotated, Literal
-from uuid import uuid4
+import asyncio
+from typing import AsyncIterator, Literal
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
 
-from app.config import get_settings, Settings
+from app.config import get_settings
 from app.security.rate_limit import enforce_rate_limit
 from app.api.v1.schemas import (
     TextInput,
     AnalysisResponse,
     HealthResponse
 )
+from app.api.v1.responses import PydanticJSONResponse
 from app.api.v1.errors import (
+    AudioCapacityError,
     AudioFileTooLargeError,
     InvalidAudioFormatError,
     TranscriptionError,
     EmptyMessageError
 )
-from app.core.scam_detector import get_classifier
-from app.core.ssf_engine import get_ssf_engine
-from app.core.honeypot import get_honeypot_agent
 from app.core.response_builder import ResponseBuilder
-from app.core.dataset_updater import get_dataset_updater
+from app.intelligence.audio_pool import get_audio_slots
 from app.intelligence.speech_to_text import get_transcriber
-from app.intelligence.voice_analysis import get_voice_analyzer
-from app.utils.helpers import sanitize_text
+from app.utils.clock import now_iso
+from app.utils.helpers import sanitize_message
+from app.utils.ids import new_request_id, new_session_id
 from app.utils.logger import logger, log_request, log_classification
 
 
+# Read-only settings, resolved once at import
+settings = get_settings()
+
 # Create router
 router = APIRouter(prefix="/api/v1", tags=["Analysis"])
 
 # Supported audio formats
 SUPPORTED_AUDIO_FORMATS = {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".webm"}
 
+# Upload read size (64KB)
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# Concurrency convention: I/O-bound services (Gemini calls) are awaited directly;
+# synchronous CPU-bound work (regex-heavy SSF analysis) runs via asyncio.to_thread
+# so it never blocks the event loop.
+
+
+async def hold_audio_slot() -> AsyncIterator[None]:
+    """Admit an audio request while a worker slot is free, else fail fast with 503"""
+    audio_slots = get_audio_slots()
+    if audio_slots.locked():
+        raise AudioCapacityError()
+    async with audio_slots:
+        yield
+
 
 @router.post(
     "/analyze/text",
@@ -49,9 +66,9 @@ SUPPORTED_AUDIO_FORMATS = {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".webm"}
 )
 async def analyze_text(
     input_data: TextInput,
-    settings: Annotated[Settings, Depends(get_settings)],
+    request: Request,
     rate_limit: None = Depends(enforce_rate_limit)
-) -> AnalysisResponse:
+) -> PydanticJSONResponse:
     """
     Analyze text message for scam detection.
 
@@ -59,23 +76,29 @@ async def analyze_text(
     - **mode**: "shield" (default) for protection only, "honeypot" for active extraction
     - **session_id**: Optional session ID for continuous chat (auto-generated if not provided)
     """
-    request_id = str(uuid4())
-    session_id = input_data.session_id or str(uuid4())
+    request_id = new_request_id()
+    session_id = input_data.session_id or new_session_id()
     log_request(request_id, "/analyze/text", input_data.mode)
 
     # Sanitize input
-    message = sanitize_text(input_data.message)
-    if not message.strip():
+    message, is_empty = sanitize_message(input_data.message)
+    if is_empty:
         raise EmptyMessageError()
 
-    # Get service instances
-    classifier = get_classifier()
-    ssf_engine = get_ssf_engine()
-    honeypot_agent = get_honeypot_agent()
-    dataset_updater = get_dataset_updater()
-
-    # Step 1: Classify the message
-    classification = await classifier.classify(message)
+    # Service instances initialized at startup
+    services = request.app.state
+    classifier = services.classifier
+    ssf_engine = services.ssf_engine
+    honeypot_agent = services.honeypot_agent
+    dataset_updater = services.dataset_updater
+    analysis_cache = services.analysis_cache
+
+    # Step 1: Classify the message (reusing cached analysis for repeats)
+    cached = analysis_cache.get(message)
+    if cached:
+        classification = cached.classification
+    else:
+        classification = await classifier.classify(message)
     log_classification(
         request_id,
         classification.is_scam,
@@ -84,7 +107,11 @@ async def analyze_text(
     )
 
     # Step 2: Generate SSF profile
-    ssf_result = ssf_engine.analyze(message)
+    if cached and cached.ssf_result:
+        ssf_result = cached.ssf_result
+    else:
+        ssf_result = await asyncio.to_thread(ssf_engine.analyze, message)
+        analysis_cache.set(message, classification, ssf_result)
 
     # Step 3: Honeypot engagement (if applicable)
     honeypot_result = None
@@ -117,7 +144,7 @@ async def analyze_text(
         session_id=session_id
     )
 
-    return response
+    return PydanticJSONResponse(response)
 
 
 @router.post(
@@ -127,21 +154,22 @@ async def analyze_text(
     description="Analyze an audio file (call recording) for scam indicators"
 )
 async def analyze_audio(
-    settings: Annotated[Settings, Depends(get_settings)],
+    request: Request,
     rate_limit: None = Depends(enforce_rate_limit),
+    audio_slot: None = Depends(hold_audio_slot),
     file: UploadFile = File(..., description="Audio file to analyze"),
     mode: Literal["shield", "honeypot"] = Form(
         default="shield",
         description="Operation mode"
     )
-) -> AnalysisResponse:
+) -> PydanticJSONResponse:
     """
     Analyze audio file for scam detection.
 
     - **file**: Audio file (wav, mp3, m4a, ogg, flac)
     - **mode**: "shield" (default) for protection only, "honeypot" for active extraction
     """
-    request_id = str(uuid4())
+    request_id = new_request_id()
     log_request(request_id, "/analyze/audio", mode)
 
     # Validate file format
@@ -151,19 +179,26 @@ async def analyze_audio(
     if file_ext not in SUPPORTED_AUDIO_FORMATS:
         raise InvalidAudioFormatError(filename)
 
-    # Read file and check size
-    audio_bytes = await file.read()
-    file_size_mb = len(audio_bytes) / (1024 * 1024)
-
-    if file_size_mb > settings.MAX_AUDIO_MB:
-        raise AudioFileTooLargeError(settings.MAX_AUDIO_MB, file_size_mb)
-
-    # Get service instances
+    # AudioUploadLimitMiddleware already capped the request body while it was
+    # received; this enforces the exact limit on the file part and bounds the
+    # in-memory copy, aborting as soon as the limit is crossed
+    max_bytes = settings.MAX_AUDIO_MB * 1024 * 1024
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            file_size_mb = (file.size or len(buffer)) / (1024 * 1024)
+            raise AudioFileTooLargeError(settings.MAX_AUDIO_MB, file_size_mb)
+    audio_bytes = bytes(buffer)
+
+    # Service instances initialized at startup (Whisper stays lazy-loaded)
+    services = request.app.state
     transcriber = get_transcriber()
-    voice_analyzer = get_voice_analyzer()
-    classifier = get_classifier()
-    ssf_engine = get_ssf_engine()
-    honeypot_agent = get_honeypot_agent()
+    voice_analyzer = services.voice_analyzer
+    classifier = services.classifier
+    ssf_engine = services.ssf_engine
+    honeypot_agent = services.honeypot_agent
+    analysis_cache = services.analysis_cache
 
     # Step 1: Transcribe audio
     try:
@@ -175,11 +210,19 @@ async def analyze_audio(
     if not transcript.strip():
         raise TranscriptionError("No speech detected in audio file")
 
-    # Step 2: Analyze voice signals
-    voice_signals = await voice_analyzer.analyze(audio_bytes, transcript)
-
-    # Step 3: Classify the transcript
-    classification = await classifier.classify(transcript)
+    transcript = transcript.strip()
+
+    # Step 2-3: Analyze voice signals and classify the transcript concurrently
+    cached = analysis_cache.get(transcript)
+    if cached:
+        classification = cached.classification
+        voice_signals = await voice_analyzer.analyze(audio_bytes, transcript)
+    else:
+        voice_signals, classification = await asyncio.gather(
+            voice_analyzer.analyze(audio_bytes, transcript),
+            classifier.classify(transcript)
+        )
+        analysis_cache.set(transcript, classification)
     log_classification(
         request_id,
         classification.is_scam,
@@ -188,7 +231,7 @@ async def analyze_audio(
     )
 
     # Step 4: Generate SSF profile (with voice signals)
-    ssf_result = ssf_engine.analyze(transcript, voice_signals)
+    ssf_result = await asyncio.to_thread(ssf_engine.analyze, transcript, voice_signals)
 
     # Step 5: Honeypot engagement (if applicable)
     honeypot_result = None
@@ -215,7 +258,7 @@ async def analyze_audio(
         request_id=request_id
     )
 
-    return response
+    return PydanticJSONResponse(response)
 
 
 @router.get(
@@ -224,18 +267,17 @@ async def analyze_audio(
     description="Get current scam dataset statistics and patterns"
 )
 async def get_dataset_stats(
-    settings: Annotated[Settings, Depends(get_settings)],
+    request: Request,
     rate_limit: None = Depends(enforce_rate_limit)
 ):
     """
     Get current dataset statistics.
     """
-    dataset_updater = get_dataset_updater()
-    stats = dataset_updater.get_dataset_stats()
+    stats = request.app.state.dataset_updater.get_dataset_stats()
     
     return {
         "dataset_stats": stats,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now_iso()
     }
 
 
@@ -249,12 +291,10 @@ health_router = APIRouter(tags=["Health"])
     summary="Health check",
     description="Check API health status"
 )
-async def health_check() -> HealthResponse:
+async def health_check() -> PydanticJSONResponse:
     """Health check endpoint for connectivity verification"""
-    from datetime import datetime, timezone
-
-    return HealthResponse(
+    return PydanticJSONResponse(HealthResponse(
         status="healthy",
         version="1.0.0",
-        timestamp=datetime.now(timezone.utc).isoformat()
-    )
+        timestamp=now_iso()
+    ))
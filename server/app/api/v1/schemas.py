@@ -125,7 +125,7 @@ class HoneypotResult(BaseModel):
 class AnalysisResponse(BaseModel):
     """Complete analysis response - deterministic JSON output"""
 
-    request_id: str = Field(..., description="Unique request identifier (UUID)")
+    request_id: str = Field(..., description="Unique time-ordered request identifier")
     session_id: str = Field(..., description="Session identifier for continuous chat")
     timestamp: str = Field(..., description="ISO-8601 timestamp of analysis")
 
@@ -188,7 +188,7 @@ class AnalysisResponse(BaseModel):
         "json_schema_extra": {
             "examples": [
                 {
-                    "request_id": "550e8400-e29b-41d4-a716-446655440000",
+                    "request_id": "019c0f2a6e40a1b2c3d4e50000000001",
                     "timestamp": "2026-01-30T12:00:00Z",
                     "is_scam": True,
                     "confidence": 0.95,
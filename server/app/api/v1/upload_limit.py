@@ -0,0 +1,71 @@
+"""
+BlockSafe Upload Limit
+Caps audio upload bodies before the multipart form is parsed
+"""
+
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.v1.errors import AudioFileTooLargeError
+from app.config import get_settings
+
+
+# Path of the audio upload endpoint
+AUDIO_UPLOAD_PATH = "/api/v1/analyze/audio"
+
+# Allowance for multipart boundaries, part headers and the form fields sent
+# alongside the file; the route still enforces MAX_AUDIO_MB on the file itself
+MULTIPART_OVERHEAD = 1 << 16
+
+
+class AudioUploadLimitMiddleware:
+    """
+    Rejects audio upload bodies larger than MAX_AUDIO_MB while they arrive.
+
+    Starlette parses (and spools) the whole multipart body before the route
+    runs, so the route's size check only bounds its own in-memory copy. This
+    middleware wraps receive(): a declared Content-Length over the limit
+    fails the first read before any body bytes are taken, and a chunked body
+    fails as soon as the running byte count crosses the limit. The error is
+    raised inside the route's form parsing, so it reaches the app's
+    HTTPException handler like any other 413.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != AUDIO_UPLOAD_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        max_mb = get_settings().MAX_AUDIO_MB
+        limit = max_mb * 1024 * 1024 + MULTIPART_OVERHEAD
+        declared = _content_length(scope)
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            if declared is not None and declared > limit:
+                raise AudioFileTooLargeError(max_mb, declared / (1024 * 1024))
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise AudioFileTooLargeError(max_mb, received / (1024 * 1024))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    """Declared Content-Length of a request, or None if absent or malformed"""
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
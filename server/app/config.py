@@ -28,6 +28,7 @@ class Settings(BaseSettings):
 
     # Configurable limits
     MAX_AUDIO_MB: int = 10
+    MAX_AUDIO_CONCURRENCY: int = 4  # Audio requests processed at once; more are rejected with 503
 
     # Gemini model configuration
     GEMINI_MODEL: str = "gemini-1.5-flash"
@@ -37,10 +38,20 @@ class Settings(BaseSettings):
     HONEYPOT_CONFIDENCE_THRESHOLD: float = 0.85
     HONEYPOT_NO_PROGRESS_TURNS: int = 2
 
+    # Dataset updater configuration
+    DATASET_CACHE_SIMILARITY: float = 0.9  # Cosine similarity to reuse a cached LLM verdict
+    DATASET_CACHE_DIR: str = ""  # Directory to persist LLM verdict caches ("" = memory only)
+
+    # Classifier cache shared across worker processes
+    CLASSIFIER_CACHE_PATH: str = ""  # SQLite file for cross-worker classification results ("" = per-process)
+
     # Whisper configuration
     WHISPER_MODEL_SIZE: str = "base"
     WHISPER_DEVICE: str = "cpu"
     WHISPER_COMPUTE_TYPE: str = "int8"
+    WHISPER_CPU_THREADS: int = 0  # 0 = use all available cores
+    WHISPER_NUM_WORKERS: int = 2  # Parallel transcriptions the model can serve
+    WHISPER_PRELOAD: bool = False  # Load the model (and librosa) at startup instead of first request
 
     @field_validator("MAX_AUDIO_MB")
     @classmethod
@@ -51,11 +62,18 @@ class Settings(BaseSettings):
             raise ValueError("MAX_AUDIO_MB cannot exceed 100MB")
         return v
 
-    @field_validator("HONEYPOT_CONFIDENCE_THRESHOLD")
+    @field_validator("MAX_AUDIO_CONCURRENCY")
+    @classmethod
+    def validate_audio_concurrency(cls, v: int) -> int:
+        if v <= 0:
+            raise ValueError("MAX_AUDIO_CONCURRENCY must be positive")
+        return v
+
+    @field_validator("HONEYPOT_CONFIDENCE_THRESHOLD", "DATASET_CACHE_SIMILARITY")
     @classmethod
     def validate_confidence_threshold(cls, v: float) -> float:
         if not 0 <= v <= 1:
-            raise ValueError("HONEYPOT_CONFIDENCE_THRESHOLD must be between 0 and 1")
+            raise ValueError("Threshold must be between 0 and 1")
         return v
 
 
@@ -0,0 +1,105 @@
+"""
+BlockSafe Analysis Cache
+TTL/LRU cache of classification and SSF results keyed by message hash
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.dataset_manager import get_dataset_manager
+from app.core.scam_detector import ClassificationResult, CLASSIFICATION_ERROR_PREFIX
+from app.core.ssf_engine import SSFResult
+from app.utils.logger import logger
+
+
+@dataclass(slots=True)
+class CachedAnalysis:
+    """Cached analysis for a sanitized message"""
+    classification: ClassificationResult
+    ssf_result: Optional[SSFResult] = None  # None when cached from a voice-aware analysis
+
+
+class AnalysisCache:
+    """
+    In-process LRU cache with per-entry TTL for repeated messages.
+
+    Keys are blake2b digests of the sanitized message, prefixed with the
+    dataset version so entries are invalidated when new patterns are added.
+    All operations are synchronous, so no locking is needed on the event loop.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl_seconds: float = 3600):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, tuple[float, CachedAnalysis]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, message: str) -> bytes:
+        version = get_dataset_manager().version
+        return hashlib.blake2b(
+            f"{version}:{message}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def get(self, message: str) -> Optional[CachedAnalysis]:
+        """
+        Look up a cached analysis.
+
+        Args:
+            message: Sanitized message or transcript
+
+        Returns:
+            CachedAnalysis if present and fresh, else None
+        """
+        key = self._key(message)
+        entry = self._entries.get(key)
+
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.info("Analysis cache hit (hits=%d, misses=%d)", self.hits, self.misses)
+        return entry[1]
+
+    def set(
+        self,
+        message: str,
+        classification: ClassificationResult,
+        ssf_result: Optional[SSFResult] = None
+    ) -> None:
+        """
+        Store an analysis. Fallback results from failed classifications are skipped.
+
+        Args:
+            message: Sanitized message or transcript
+            classification: Classification result
+            ssf_result: Text-only SSF result, if computed
+        """
+        if classification.reasoning.startswith(CLASSIFICATION_ERROR_PREFIX):
+            return
+
+        key = self._key(message)
+        self._entries[key] = (time.monotonic(), CachedAnalysis(classification, ssf_result))
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Singleton instance
+_analysis_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get singleton analysis cache instance"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisCache()
+    return _analysis_cache
@@ -5,15 +5,41 @@ Manages loading and updating of scam patterns dataset
 
 import json
 import os
+import sys
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from dataclasses import dataclass
-from difflib import SequenceMatcher
 
+import numpy as np
+
+from app.core.semantic_cache import EMBEDDING_DIM, EMBEDDING_DTYPE, embed_text
+from app.utils.keyword_matcher import KeywordMatcher
 from app.utils.logger import logger
 
 
-@dataclass
+# Indicator phrases for each behavioral pattern (keys are lowercase)
+BEHAVIOR_INDICATORS: Dict[str, List[str]] = {
+    "creates urgency": ["urgent", "immediately", "now", "quick", "asap"],
+    "asks for otp": ["otp", "verification code", "6 digit", "code"],
+    "asks for cvv or pin": ["cvv", "pin", "card number", "16 digit"],
+    "impersonates bank official": ["bank", "manager", "officer", "security"],
+    "reverse payment logic": ["receive money", "get refund", "collect"],
+    "fake refund story": ["refund", "cancelled", "return money"],
+    "screenshare request": ["screen share", "anydesk", "teamviewer"],
+    "asks for upfront fee": ["registration fee", "processing fee", "advance"],
+    "too-good-to-be-true salary": ["lakh", "high salary", "easy money"],
+    "fear intimidation": ["arrest", "legal action", "police", "court"],
+    "asks for immediate payment": ["pay now", "transfer", "send money"],
+    "voice cloning": ["emergency", "help me", "trust me"],
+    "emotional manipulation": ["love", "relationship", "future"]
+}
+
+_BEHAVIOR_INDICATOR_SETS: Dict[str, frozenset] = {
+    behavior: frozenset(indicators) for behavior, indicators in BEHAVIOR_INDICATORS.items()
+}
+
+
+@dataclass(slots=True)
 class ScamPattern:
     """Represents a scam pattern from the dataset"""
     scam_id: str
@@ -25,6 +51,20 @@ class ScamPattern:
     behavioral_patterns: List[str]
     risk_level: str
 
+    @classmethod
+    def from_dict(cls, scam_data: Dict) -> "ScamPattern":
+        """Build a pattern from a dataset entry"""
+        return cls(
+            scam_id=scam_data['scam_id'],
+            category=scam_data['category'],
+            scam_type=scam_data['scam_type'],
+            channels=scam_data['channels'],
+            description=scam_data['description'],
+            common_keywords=scam_data['common_keywords'],
+            behavioral_patterns=scam_data['behavioral_patterns'],
+            risk_level=scam_data['risk_level']
+        )
+
 
 class ScamDatasetManager:
     """Manages scam dataset loading and updating"""
@@ -35,29 +75,34 @@ class ScamDatasetManager:
         )
         self.dataset: Dict = {}
         self.patterns: List[ScamPattern] = []
+        self.version = 0  # Bumped whenever the pattern set changes
+        self._matcher = KeywordMatcher([])
+        self._keywords: List[str] = []
+        self._behaviors: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._behavior_ids: Dict[str, int] = {}
+        self._keyword_bits = np.zeros((0, 0), dtype=np.uint8)
+        self._behavior_bits = np.zeros((0, 0), dtype=np.uint8)
+        self._totals = np.zeros(0)
+        self._keyword_sets: List[frozenset] = []
+        self._behavior_sets: List[frozenset] = []
+        self._category_index: Dict[str, List[int]] = {}
+        self._keyword_postings: Dict[str, Set[int]] = {}
+        self._pattern_matrix = np.zeros((0, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
         self.load_dataset()
     
     def load_dataset(self) -> None:
         """Load scam dataset from JSON file"""
         try:
-            with open(self.dataset_path, 'r', encoding='utf-8') as f:
-                self.dataset = json.load(f)
+            # Read raw bytes in one call; json.loads decodes UTF-8 itself
+            with open(self.dataset_path, 'rb') as f:
+                self.dataset = json.loads(f.read())
             
             # Convert to ScamPattern objects
-            self.patterns = []
-            for scam_data in self.dataset.get('scams', []):
-                pattern = ScamPattern(
-                    scam_id=scam_data['scam_id'],
-                    category=scam_data['category'],
-                    scam_type=scam_data['scam_type'],
-                    channels=scam_data['channels'],
-                    description=scam_data['description'],
-                    common_keywords=scam_data['common_keywords'],
-                    behavioral_patterns=scam_data['behavioral_patterns'],
-                    risk_level=scam_data['risk_level']
-                )
-                self.patterns.append(pattern)
+            self.patterns = [ScamPattern.from_dict(scam_data) for scam_data in self.dataset.get('scams', [])]
             
+            self._build_index()
+            self.version += 1
             logger.info(f"Loaded {len(self.patterns)} scam patterns from dataset")
             
         except FileNotFoundError:
@@ -69,78 +114,194 @@ class ScamDatasetManager:
             self.dataset = {"scams": []}
             self.patterns = []
     
+    def _build_index(self) -> None:
+        """
+        Precompute lookup structures for find_similar_patterns.
+
+        Builds a single matcher over all keywords and behavior indicators, plus
+        struct-of-arrays bitsets (one packed row of keyword ids and one of
+        behavior ids per pattern) so scoring is a vectorized AND + popcount.
+        Also indexes patterns by category and keyword so duplicate checks only
+        compare against plausible candidates, and embeds every pattern into a
+        normalized matrix for find_similar_patterns_vec.
+
+        Runs on load; add_new_pattern extends the index with _index_pattern.
+        """
+        self._keywords = []
+        self._behaviors = []
+        self._keyword_ids = {}
+        self._behavior_ids = {}
+        self._keyword_sets = []
+        self._behavior_sets = []
+        self._category_index = {}
+        self._keyword_postings = {}
+        self._keyword_bits = np.zeros((len(self.patterns), 0), dtype=np.uint8)
+        self._behavior_bits = np.zeros((len(self.patterns), 0), dtype=np.uint8)
+        self._totals = np.zeros(len(self.patterns))
+        self._pattern_matrix = np.zeros((len(self.patterns), EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+        for pattern in self.patterns:
+            self._index_pattern(pattern)
+        self._matcher = self._build_matcher()
+    
+    def _index_pattern(self, pattern: ScamPattern) -> bool:
+        """
+        Append one pattern to the index structures.
+
+        Rows live in arrays that grow by doubling, so appending costs the
+        pattern's own terms rather than a pass over every pattern. Only the
+        first len(self.patterns) rows are valid.
+
+        Returns:
+            True if the pattern introduced keywords the matcher doesn't know
+        """
+        row = len(self._keyword_sets)
+        # Lowercased strings are interned so patterns share one copy of each term
+        keywords = frozenset(sys.intern(kw.lower()) for kw in pattern.common_keywords)
+        behaviors = frozenset(sys.intern(bp.lower()) for bp in pattern.behavioral_patterns)
+        self._keyword_sets.append(keywords)
+        self._behavior_sets.append(behaviors)
+        
+        new_keywords = False
+        for kw in keywords:
+            if kw not in self._keyword_ids:
+                self._keyword_ids[kw] = len(self._keywords)
+                self._keywords.append(kw)
+                new_keywords = True
+        for bp in behaviors:
+            if bp not in self._behavior_ids:
+                self._behavior_ids[bp] = len(self._behaviors)
+                self._behaviors.append(bp)
+        
+        # Bits are packed big-endian, as np.packbits lays them out
+        self._keyword_bits = self._reserve(self._keyword_bits, (row + 1, (len(self._keywords) + 7) // 8))
+        self._behavior_bits = self._reserve(self._behavior_bits, (row + 1, (len(self._behaviors) + 7) // 8))
+        for kw in keywords:
+            bit = self._keyword_ids[kw]
+            self._keyword_bits[row, bit >> 3] |= 0x80 >> (bit & 7)
+        for bp in behaviors:
+            bit = self._behavior_ids[bp]
+            self._behavior_bits[row, bit >> 3] |= 0x80 >> (bit & 7)
+        self._totals = self._reserve(self._totals, (row + 1,))
+        self._totals[row] = len(keywords) + len(behaviors)
+        
+        self._category_index.setdefault(sys.intern(pattern.category.lower()), []).append(row)
+        for kw in keywords:
+            self._keyword_postings.setdefault(kw, set()).add(row)
+        
+        self._pattern_matrix = self._reserve(self._pattern_matrix, (row + 1, EMBEDDING_DIM))
+        self._pattern_matrix[row] = embed_text(self._pattern_text(pattern))
+        return new_keywords
+    
+    def _build_matcher(self) -> KeywordMatcher:
+        """Matcher over all pattern keywords and behavior indicators"""
+        terms = list(self._keywords)
+        for indicators in BEHAVIOR_INDICATORS.values():
+            terms.extend(indicators)
+        return KeywordMatcher(terms)
+    
+    @staticmethod
+    def _reserve(array: np.ndarray, shape: tuple) -> np.ndarray:
+        """Return array, or a zero-padded copy at least doubled in each dimension that is too small"""
+        if all(have >= need for have, need in zip(array.shape, shape)):
+            return array
+        capacity = tuple(
+            have if have >= need else max(need, 2 * have)
+            for have, need in zip(array.shape, shape)
+        )
+        grown = np.zeros(capacity, dtype=array.dtype)
+        grown[tuple(slice(0, have) for have in array.shape)] = array
+        return grown
+    
     def find_similar_patterns(self, message: str, threshold: float = 0.7) -> List[ScamPattern]:
         """Find similar scam patterns based on keywords and behavioral patterns"""
-        similar_patterns = []
-        message_lower = message.lower()
+        if not self.patterns:
+            return []
         
-        for pattern in self.patterns:
-            similarity_score = 0
-            matches = 0
-            
-            # Check keyword matches
-            for keyword in pattern.common_keywords:
-                if keyword.lower() in message_lower:
-                    matches += 1
-                    similarity_score += 0.3
-            
-            # Check behavioral pattern indicators
-            for behavior in pattern.behavioral_patterns:
-                if self._check_behavioral_match(message_lower, behavior):
-                    matches += 1
-                    similarity_score += 0.4
-            
-            # Normalize score
-            total_indicators = len(pattern.common_keywords) + len(pattern.behavioral_patterns)
-            if total_indicators > 0:
-                normalized_score = similarity_score / total_indicators
-                if normalized_score >= threshold:
-                    similar_patterns.append(pattern)
-        
-        return similar_patterns
-    
-    def _check_behavioral_match(self, message: str, behavior: str) -> bool:
-        """Check if message matches behavioral pattern"""
-        behavior_indicators = {
-            "creates urgency": ["urgent", "immediately", "now", "quick", "asap"],
-            "asks for OTP": ["otp", "verification code", "6 digit", "code"],
-            "asks for CVV or PIN": ["cvv", "pin", "card number", "16 digit"],
-            "impersonates bank official": ["bank", "manager", "officer", "security"],
-            "reverse payment logic": ["receive money", "get refund", "collect"],
-            "fake refund story": ["refund", "cancelled", "return money"],
-            "screenshare request": ["screen share", "anydesk", "teamviewer"],
-            "asks for upfront fee": ["registration fee", "processing fee", "advance"],
-            "too-good-to-be-true salary": ["lakh", "high salary", "easy money"],
-            "fear intimidation": ["arrest", "legal action", "police", "court"],
-            "asks for immediate payment": ["pay now", "transfer", "send money"],
-            "voice cloning": ["emergency", "help me", "trust me"],
-            "emotional manipulation": ["love", "relationship", "future"]
-        }
-        
-        indicators = behavior_indicators.get(behavior.lower(), [])
-        return any(indicator in message for indicator in indicators)
+        rows = len(self.patterns)
+        hits = self._matcher.find(message.lower())
+        keyword_hits = np.packbits(np.fromiter(
+            (kw in hits for kw in self._keywords), dtype=bool, count=len(self._keywords)
+        ))
+        behavior_hits = np.packbits(np.fromiter(
+            (self._check_behavioral_match(hits, bp) for bp in self._behaviors),
+            dtype=bool,
+            count=len(self._behaviors)
+        ))
+        
+        # Popcount of matched bits per pattern
+        keyword_bits = self._keyword_bits[:rows, :keyword_hits.size]
+        behavior_bits = self._behavior_bits[:rows, :behavior_hits.size]
+        keyword_matches = np.unpackbits(keyword_bits & keyword_hits, axis=1).sum(axis=1)
+        behavior_matches = np.unpackbits(behavior_bits & behavior_hits, axis=1).sum(axis=1)
+        
+        # Keyword matches weigh 0.3, behavioral matches 0.4; normalize by indicator count
+        totals = self._totals[:rows]
+        scores = keyword_matches * 0.3 + behavior_matches * 0.4
+        normalized = np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+        matched = np.flatnonzero((totals > 0) & (normalized >= threshold))
+        
+        return [self.patterns[i] for i in matched]
+    
+    def find_similar_patterns_vec(
+        self,
+        query_vec: np.ndarray,
+        k: int = 3,
+        threshold: float = 0.6
+    ) -> List[ScamPattern]:
+        """
+        Find the patterns whose embedding is closest to a message embedding.
+
+        Args:
+            query_vec: Normalized message embedding (see embed_text)
+            k: Maximum number of patterns to return
+            threshold: Minimum cosine similarity
+
+        Returns:
+            Up to k patterns, most similar first
+        """
+        if not self.patterns or k <= 0:
+            return []
+        
+        scores = self._pattern_matrix[:len(self.patterns)] @ query_vec
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        
+        return [self.patterns[i] for i in top if scores[i] >= threshold]
+    
+    @staticmethod
+    def _pattern_text(pattern: ScamPattern) -> str:
+        """Text that represents a pattern in embedding space"""
+        return " ".join([pattern.scam_type, pattern.description, *pattern.common_keywords])
+    
+    def _check_behavioral_match(self, hits: set, behavior: str) -> bool:
+        """Check if any indicator of a behavioral pattern was matched in the message"""
+        indicators = _BEHAVIOR_INDICATOR_SETS.get(behavior.lower())
+        return indicators is not None and not indicators.isdisjoint(hits)
     
     def is_duplicate_pattern(self, new_scam_data: Dict, similarity_threshold: float = 0.8) -> bool:
         """Check if new scam pattern is too similar to existing ones"""
         new_keywords = set(kw.lower() for kw in new_scam_data.get('common_keywords', []))
         new_behaviors = set(bp.lower() for bp in new_scam_data.get('behavioral_patterns', []))
         
-        for pattern in self.patterns:
-            existing_keywords = set(kw.lower() for kw in pattern.common_keywords)
-            existing_behaviors = set(bp.lower() for bp in pattern.behavioral_patterns)
-            
+        # Duplicates must share the category and (for a non-empty keyword set) at least one keyword
+        candidates = self._category_index.get(new_scam_data.get('category', '').lower(), [])
+        if new_keywords:
+            sharing_keyword = set()
+            for kw in new_keywords:
+                sharing_keyword |= self._keyword_postings.get(kw, set())
+            candidates = [row for row in candidates if row in sharing_keyword]
+        
+        for row in candidates:
             # Calculate similarity
-            keyword_similarity = self._jaccard_similarity(new_keywords, existing_keywords)
-            behavior_similarity = self._jaccard_similarity(new_behaviors, existing_behaviors)
-            
-            # Check if same category and type
-            same_category = new_scam_data.get('category', '').lower() == pattern.category.lower()
-            same_type = new_scam_data.get('scam_type', '').lower() == pattern.scam_type.lower()
+            keyword_similarity = self._jaccard_similarity(new_keywords, self._keyword_sets[row])
+            behavior_similarity = self._jaccard_similarity(new_behaviors, self._behavior_sets[row])
             
             # If high similarity in both keywords and behaviors, consider duplicate
             if (keyword_similarity > similarity_threshold and 
-                behavior_similarity > similarity_threshold and
-                same_category):
+                behavior_similarity > similarity_threshold):
                 return True
         
         return False
@@ -173,17 +334,11 @@ class ScamDatasetManager:
         self.dataset['last_updated'] = datetime.now().strftime("%Y-%m-%d")
         
         # Create pattern object
-        pattern = ScamPattern(
-            scam_id=scam_data['scam_id'],
-            category=scam_data['category'],
-            scam_type=scam_data['scam_type'],
-            channels=scam_data['channels'],
-            description=scam_data['description'],
-            common_keywords=scam_data['common_keywords'],
-            behavioral_patterns=scam_data['behavioral_patterns'],
-            risk_level=scam_data['risk_level']
-        )
+        pattern = ScamPattern.from_dict(scam_data)
         self.patterns.append(pattern)
+        if self._index_pattern(pattern):
+            self._matcher = self._build_matcher()
+        self.version += 1
         
         # Save to file
         self.save_dataset()
@@ -193,8 +348,10 @@ class ScamDatasetManager:
     def save_dataset(self) -> None:
         """Save dataset to JSON file"""
         try:
-            with open(self.dataset_path, 'w', encoding='utf-8') as f:
-                json.dump(self.dataset, f, indent=2, ensure_ascii=False)
+            # Serialize fully before opening so the file is written in one call
+            payload = json.dumps(self.dataset, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(self.dataset_path, 'wb') as f:
+                f.write(payload)
         except Exception as e:
             logger.error(f"Failed to save dataset: {e}")
     
@@ -4,15 +4,21 @@ Automatically updates scam dataset when new patterns are detected
 """
 
 import asyncio
-from typing import Dict, List, Optional
+import hashlib
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
 
-from google import genai
-from google.genai import types
+import numpy as np
 
 from app.config import get_settings
 from app.core.dataset_manager import get_dataset_manager, ScamPattern
+from app.core.genai_session import get_genai_client
+from app.core.prompt_batcher import PromptBatcher
 from app.core.scam_detector import ClassificationResult
+from app.core.semantic_cache import SemanticCache, embed_text
 from app.core.ssf_engine import SSFResult
 from app.utils.logger import logger
 
@@ -24,13 +30,37 @@ class DatasetUpdater:
         self.dataset_manager = get_dataset_manager()
         self.settings = get_settings()
         self._client = None
+        self._novelty_batcher: Optional[PromptBatcher] = None
+        self._pattern_batcher: Optional[PromptBatcher] = None
+        # Near-duplicate messages reuse earlier LLM verdicts; entries are (scam_type, result)
+        cache_dir = self.settings.DATASET_CACHE_DIR
+        self._novelty_cache = SemanticCache(
+            capacity=512,
+            threshold=self.settings.DATASET_CACHE_SIMILARITY,
+            path=os.path.join(cache_dir, "novelty_cache") if cache_dir else None
+        )
+        self._pattern_cache = SemanticCache(
+            capacity=512,
+            threshold=self.settings.DATASET_CACHE_SIMILARITY,
+            path=os.path.join(cache_dir, "pattern_cache") if cache_dir else None
+        )
+        # Analyses currently running, keyed by message digest
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._stats_cache: Optional[Tuple[int, Dict]] = None
         self._configure_ai()
     
     def _configure_ai(self):
         """Configure AI client for pattern analysis"""
         try:
-            self._client = genai.Client(
-                api_key=self.settings.GEMINI_API_KEY.get_secret_value()
+            self._client = get_genai_client()
+            # Both prompts embed the scam message, so they are never batched
+            # together: one attacker's text could steer another request's
+            # answer, which add_new_pattern writes into the dataset
+            self._novelty_batcher = PromptBatcher(
+                self._client, self.settings.GEMINI_MODEL, temperature=0.2, max_output_tokens=512, max_batch=1
+            )
+            self._pattern_batcher = PromptBatcher(
+                self._client, self.settings.GEMINI_MODEL, temperature=0.3, max_output_tokens=1024, max_batch=1
             )
         except Exception as e:
             logger.error(f"Failed to configure AI for dataset updater: {e}")
@@ -55,6 +85,39 @@ class DatasetUpdater:
         if not classification.is_scam or classification.confidence < 0.8:
             return False
         
+        # Concurrent requests for the same message share a single analysis
+        key = hashlib.blake2b(message.encode("utf-8"), digest_size=16).digest()
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.debug("Joining in-flight dataset analysis")
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            added = await self._analyze_message(message, classification, ssf_result)
+        except asyncio.CancelledError:
+            # The leader was cancelled; waiters simply report no new pattern
+            future.set_result(False)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark as retrieved so an unawaited future doesn't warn
+            future.exception()
+            raise
+        else:
+            future.set_result(added)
+            return added
+        finally:
+            del self._inflight[key]
+    
+    async def _analyze_message(
+        self,
+        message: str,
+        classification: ClassificationResult,
+        ssf_result: SSFResult
+    ) -> bool:
+        """Run the pattern lookup, novelty check and pattern generation for one message"""
         # Check if similar patterns already exist
         similar_patterns = self.dataset_manager.find_similar_patterns(message, threshold=0.6)
         
@@ -63,27 +126,55 @@ class DatasetUpdater:
             logger.debug("Similar patterns found, not adding to dataset")
             return False
         
+        # Embed once for both semantic caches
+        message_vector = embed_text(message)
+        
+        # Templated scams repeat heavily, so check the semantic caches before calling the LLM
         # Use AI to analyze if this is a genuinely new pattern
-        is_new_pattern = await self._ai_analyze_novelty(message, classification, similar_patterns)
+        is_new_pattern = self._cache_lookup(self._novelty_cache, message_vector, classification)
+        if is_new_pattern is None:
+            is_new_pattern = await self._ai_analyze_novelty(message, classification, similar_patterns)
+            if is_new_pattern is not None:
+                self._novelty_cache.insert(message_vector, (classification.scam_type, is_new_pattern))
         
         if not is_new_pattern:
             return False
         
         # Generate new pattern data
-        new_pattern_data = await self._generate_pattern_data(message, classification, ssf_result)
+        new_pattern_data = self._cache_lookup(self._pattern_cache, message_vector, classification)
+        if new_pattern_data is None:
+            new_pattern_data = await self._generate_pattern_data(message, classification, ssf_result)
+            if new_pattern_data:
+                self._pattern_cache.insert(message_vector, (classification.scam_type, new_pattern_data))
+        else:
+            # add_new_pattern mutates the dict it is given
+            new_pattern_data = dict(new_pattern_data)
         
         if new_pattern_data:
             return self.dataset_manager.add_new_pattern(new_pattern_data)
         
         return False
     
+    def _cache_lookup(
+        self,
+        cache: SemanticCache,
+        message_vector: np.ndarray,
+        classification: ClassificationResult
+    ):
+        """Return a cached LLM result for a near-duplicate message of the same scam type"""
+        entry = cache.lookup(message_vector)
+        if entry is None or entry[0] != classification.scam_type:
+            return None
+        logger.debug("Dataset updater semantic cache hit")
+        return entry[1]
+    
     async def _ai_analyze_novelty(
         self, 
         message: str, 
         classification: ClassificationResult,
         similar_patterns: List[ScamPattern]
-    ) -> bool:
-        """Use AI to determine if this is a genuinely new scam pattern"""
+    ) -> Optional[bool]:
+        """Use AI to determine if this is a genuinely new scam pattern (None if the call failed)"""
         if not self._client:
             return False
         
@@ -111,28 +202,18 @@ Respond with JSON:
 }}"""
 
         try:
-            response = await self._client.aio.models.generate_content(
-                model=self.settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    max_output_tokens=512
-                )
-            )
-            
-            import json
-            result = json.loads(response.text.strip())
+            result = await self._novelty_batcher.submit(prompt)
             
             is_new = result.get('is_new_pattern', False)
             novelty_score = result.get('novelty_score', 0.0)
             
-            logger.info(f"Novelty analysis: new={is_new}, score={novelty_score}")
+            logger.info("Novelty analysis: new=%s, score=%s", is_new, novelty_score)
             
             return is_new and novelty_score >= 0.7
             
         except Exception as e:
             logger.error(f"AI novelty analysis failed: {e}")
-            return False
+            return None
     
     async def _generate_pattern_data(
         self, 
@@ -167,17 +248,7 @@ Generate a complete scam pattern in JSON format:
 Extract actual keywords and patterns from the message. Be specific and accurate."""
 
         try:
-            response = await self._client.aio.models.generate_content(
-                model=self.settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=1024
-                )
-            )
-            
-            import json
-            pattern_data = json.loads(response.text.strip())
+            pattern_data = await self._pattern_batcher.submit(prompt)
             
             # Validate required fields
             required_fields = ['category', 'scam_type', 'channels', 'description', 
@@ -194,34 +265,34 @@ Extract actual keywords and patterns from the message. Be specific and accurate.
             logger.error(f"Pattern generation failed: {e}")
             return None
     
+    async def aclose(self) -> None:
+        """Stop the prompt batchers' background workers and save the semantic caches"""
+        for batcher in (self._novelty_batcher, self._pattern_batcher):
+            if batcher is not None:
+                await batcher.aclose()
+        for cache in (self._novelty_cache, self._pattern_cache):
+            await cache.aclose()
+    
     def get_dataset_stats(self) -> Dict:
-        """Get current dataset statistics"""
+        """Get current dataset statistics (cached until the dataset changes)"""
+        version = self.dataset_manager.version
+        if self._stats_cache is not None and self._stats_cache[0] == version:
+            return self._stats_cache[1]
+        
         patterns = self.dataset_manager.patterns
         
         stats = {
             "total_patterns": len(patterns),
-            "categories": {},
-            "risk_levels": {},
+            "categories": dict(Counter(p.category for p in patterns)),
+            "risk_levels": dict(Counter(p.risk_level for p in patterns)),
             "last_updated": self.dataset_manager.dataset.get('last_updated', 'unknown')
         }
         
-        for pattern in patterns:
-            # Count by category
-            stats["categories"][pattern.category] = stats["categories"].get(pattern.category, 0) + 1
-            
-            # Count by risk level
-            stats["risk_levels"][pattern.risk_level] = stats["risk_levels"].get(pattern.risk_level, 0) + 1
-        
+        self._stats_cache = (version, stats)
         return stats
 
 
-# Singleton instance
-_dataset_updater: Optional[DatasetUpdater] = None
-
-
+@lru_cache(maxsize=1)
 def get_dataset_updater() -> DatasetUpdater:
     """Get singleton dataset updater instance"""
-    global _dataset_updater
-    if _dataset_updater is None:
-        _dataset_updater = DatasetUpdater()
-    return _dataset_updater
\ No newline at end of file
+    return DatasetUpdater()
\ No newline at end of file
@@ -3,7 +3,9 @@ BlockSafe Decision Engine
 Central decision-making logic for analysis flow
 """
 
-from typing import Optional, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Tuple
 from dataclasses import dataclass
 
 from app.config import get_settings
@@ -11,7 +13,7 @@ from app.core.scam_detector import ClassificationResult
 from app.core.ssf_engine import SSFResult
 
 
-@dataclass
+@dataclass(slots=True)
 class Decision:
     """Decision output from the engine"""
     should_engage_honeypot: bool
@@ -20,12 +22,38 @@ class Decision:
     recommended_action: str
 
 
+# Confidence cut points shared by the level and risk lookups (bisect -> bucket 0-4)
+_CONFIDENCE_CUTS = (0.6, 0.7, 0.85, 0.9)
+_CONFIDENCE_LEVELS = ("LOW", "MEDIUM", "MEDIUM", "HIGH", "HIGH")
+_CONFIDENCE_RISK_FACTORS = (
+    None,
+    None,
+    "High confidence scam detection",
+    "High confidence scam detection",
+    "Very high confidence scam detection",
+)
+
+NO_RISK = "No significant risk detected."
+LEGITIMATE_RECOMMENDATION = "No action required. Message appears legitimate."
+
+# Recommendation for a scam, keyed by (is shield mode, honeypot engaged)
+_SCAM_RECOMMENDATIONS = {
+    (True, False): "Block/ignore message. Do not respond or click any links.",
+    (True, True): "Block/ignore message. Do not respond or click any links.",
+    (False, True): "Honeypot engagement initiated for intelligence extraction.",
+    (False, False): "Message flagged as suspicious. Recommend user verification through official channels.",
+}
+
+
 class DecisionEngine:
     """
     Central decision-making engine for BlockSafe.
     Determines actions based on classification and SSF results.
     """
 
+    def __init__(self):
+        self._engage_threshold = get_settings().HONEYPOT_CONFIDENCE_THRESHOLD
+
     def evaluate(
         self,
         classification: ClassificationResult,
@@ -43,57 +71,54 @@ class DecisionEngine:
         Returns:
             Decision with recommended actions
         """
-        settings = get_settings()
+        confidence = classification.confidence
+        bucket = bisect_right(_CONFIDENCE_CUTS, confidence)
 
-        # Determine confidence level
-        confidence_level = self._get_confidence_level(classification.confidence)
-
-        # Determine if honeypot should engage
-        should_engage = (
-            mode == "honeypot" and
-            classification.is_scam and
-            classification.confidence >= settings.HONEYPOT_CONFIDENCE_THRESHOLD
-        )
-
-        # Risk assessment
-        risk_assessment = self._assess_risk(classification, ssf)
+        if not classification.is_scam:
+            return Decision(
+                should_engage_honeypot=False,
+                confidence_level=_CONFIDENCE_LEVELS[bucket],
+                risk_assessment=NO_RISK,
+                recommended_action=LEGITIMATE_RECOMMENDATION
+            )
 
-        # Recommended action
-        recommended_action = self._get_recommendation(
-            classification, ssf, mode, should_engage
-        )
+        should_engage = mode == "honeypot" and confidence >= self._engage_threshold
 
         return Decision(
             should_engage_honeypot=should_engage,
-            confidence_level=confidence_level,
-            risk_assessment=risk_assessment,
-            recommended_action=recommended_action
+            confidence_level=_CONFIDENCE_LEVELS[bucket],
+            risk_assessment=self._scam_risk(classification, ssf, bucket),
+            recommended_action=_SCAM_RECOMMENDATIONS[(mode == "shield", should_engage)]
         )
 
-    def _get_confidence_level(self, confidence: float) -> str:
+    @staticmethod
+    def _get_confidence_level(confidence: float) -> str:
         """Map confidence score to level"""
-        if confidence >= 0.85:
-            return "HIGH"
-        elif confidence >= 0.6:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        return _CONFIDENCE_LEVELS[bisect_right(_CONFIDENCE_CUTS, confidence)]
 
+    @staticmethod
     def _assess_risk(
-        self,
         classification: ClassificationResult,
         ssf: SSFResult
     ) -> str:
         """Generate risk assessment summary"""
         if not classification.is_scam:
-            return "No significant risk detected."
+            return NO_RISK
+        bucket = bisect_right(_CONFIDENCE_CUTS, classification.confidence)
+        return DecisionEngine._scam_risk(classification, ssf, bucket)
 
+    @staticmethod
+    def _scam_risk(
+        classification: ClassificationResult,
+        ssf: SSFResult,
+        bucket: int
+    ) -> str:
+        """Risk summary for a detected scam, given its confidence bucket"""
         risk_factors = []
 
-        if classification.confidence >= 0.9:
-            risk_factors.append("Very high confidence scam detection")
-        elif classification.confidence >= 0.7:
-            risk_factors.append("High confidence scam detection")
+        confidence_factor = _CONFIDENCE_RISK_FACTORS[bucket]
+        if confidence_factor:
+            risk_factors.append(confidence_factor)
 
         if ssf.urgency_score >= 0.7:
             risk_factors.append("High-pressure tactics detected")
@@ -112,8 +137,8 @@ class DecisionEngine:
 
         return " | ".join(risk_factors)
 
+    @staticmethod
     def _get_recommendation(
-        self,
         classification: ClassificationResult,
         ssf: SSFResult,
         mode: str,
@@ -121,24 +146,11 @@ class DecisionEngine:
     ) -> str:
         """Generate recommended action"""
         if not classification.is_scam:
-            return "No action required. Message appears legitimate."
-
-        if mode == "shield":
-            return "Block/ignore message. Do not respond or click any links."
-
-        if should_engage:
-            return "Honeypot engagement initiated for intelligence extraction."
-
-        return "Message flagged as suspicious. Recommend user verification through official channels."
-
-
-# Module-level instance
-_decision_engine: Optional[DecisionEngine] = None
+            return LEGITIMATE_RECOMMENDATION
+        return _SCAM_RECOMMENDATIONS[(mode == "shield", should_engage)]
 
 
+@lru_cache(maxsize=1)
 def get_decision_engine() -> DecisionEngine:
     """Get DecisionEngine instance"""
-    global _decision_engine
-    if _decision_engine is None:
-        _decision_engine = DecisionEngine()
-    return _decision_engine
+    return DecisionEngine()
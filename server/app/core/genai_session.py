@@ -0,0 +1,51 @@
+"""
+BlockSafe Gemini Session
+Shared google-genai client with a pooled async HTTP connection
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.utils.logger import logger
+
+if TYPE_CHECKING:
+    from google import genai
+
+
+_genai_client: Optional["genai.Client"] = None
+
+
+def get_genai_client() -> "genai.Client":
+    """
+    Get the shared google-genai client (created on first use).
+
+    The SDK is imported here rather than at module load, so workers and
+    tools that never call Gemini don't pay its import time and memory.
+    """
+    global _genai_client
+    if _genai_client is None:
+        from google import genai
+        from google.genai import types
+
+        settings = get_settings()
+        # Keep-alive pool shared by every async Gemini call
+        async_client_args = {
+            "transport": httpx.AsyncHTTPTransport(retries=1),
+            "limits": httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        }
+        _genai_client = genai.Client(
+            api_key=settings.GEMINI_API_KEY.get_secret_value(),
+            http_options=types.HttpOptions(async_client_args=async_client_args)
+        )
+        logger.info("Shared Gemini client created")
+    return _genai_client
+
+
+async def close_genai_client() -> None:
+    """Close the shared client's connection pool (call at shutdown)"""
+    global _genai_client
+    if _genai_client is not None:
+        await _genai_client.aio.aclose()
+        _genai_client = None
@@ -3,19 +3,26 @@ BlockSafe Honeypot Engine
 Agentic intelligence extraction with bounded conversation and kill-switch logic
 """
 
-import json
-from typing import Optional, List, Tuple
+import asyncio
+import hashlib
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-
-from google import genai
-from google.genai import types
+from functools import lru_cache
 
 from app.config import get_settings
-from app.utils.helpers import extract_all_entities, merge_entities, count_entities, ExtractedData
+from app.core.genai_session import get_genai_client
+from app.utils.helpers import extract_all_entities, merge_entities_counted, count_entities, ExtractedData
 from app.utils.logger import logger, log_honeypot
 
 
+# Word bitsets for repeated-message detection use 4096 hashed bits, enough
+# that collisions rarely inflate the shared-word count of a chat message
+WORD_BITSET_MASK = 4095
+
+
 class TerminationReason(Enum):
     """Reasons for honeypot termination"""
     MAX_TURNS_REACHED = "max_turns_reached"
@@ -28,7 +35,7 @@ class TerminationReason(Enum):
     MODE_SHIELD = "shield_mode_no_engagement"
 
 
-@dataclass
+@dataclass(slots=True)
 class HoneypotTurn:
     """Single turn in honeypot conversation"""
     turn_number: int
@@ -37,7 +44,7 @@ class HoneypotTurn:
     entities_extracted: ExtractedData
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HoneypotResult:
     """Result from honeypot engagement"""
     engaged: bool
@@ -62,10 +69,6 @@ class HoneypotAgent:
     - Honeypot mode (active engagement)
     """
 
-    _instance: Optional["HoneypotAgent"] = None
-    _client = None
-    _configured = False
-
     ENGAGEMENT_PROMPT = """You are an AI assistant pretending to be a vulnerable, slightly confused elderly person who might fall for scams. Your goal is to extract intelligence from scammers WITHOUT revealing you are an AI.
 
 CONTEXT:
@@ -85,29 +88,35 @@ CONVERSATION HISTORY:
 Respond as the confused elderly person. Keep response under 100 words. Try to extract more information naturally.
 Your response:"""
 
+    # Constant prompt segments around the two slots, so each turn is a plain join
+    _PROMPT_PREFIX, _PROMPT_REST = ENGAGEMENT_PROMPT.split("{scammer_message}")
+    _PROMPT_MIDDLE, _PROMPT_SUFFIX = _PROMPT_REST.split("{history}")
+
     SHIELD_RESPONSE = """I appreciate you reaching out, but I need to verify this through official channels. 
 I'll contact my bank directly using the number on my card. Thank you for your concern."""
 
-    def __new__(cls) -> "HoneypotAgent":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
     def __init__(self):
-        if not HoneypotAgent._configured:
-            self._configure()
+        self._client = None
+        self._settings = None
+        self._generation_config = None
+        self._configure()
 
     def _configure(self) -> None:
         """Configure Gemini for honeypot engagement"""
         try:
-            settings = get_settings()
+            # Share the pooled google-genai client (imports the SDK on first use)
+            self._client = get_genai_client()
+
+            from google.genai import types
 
-            # Initialize the new google-genai client
-            HoneypotAgent._client = genai.Client(
-                api_key=settings.GEMINI_API_KEY.get_secret_value()
+            # Settings and generation config are fixed for the process; build them once
+            self._settings = get_settings()
+            self._generation_config = types.GenerateContentConfig(
+                temperature=0.7,
+                top_p=0.95,
+                max_output_tokens=256,
             )
 
-            HoneypotAgent._configured = True
             logger.info("Honeypot agent configured")
 
         except Exception as e:
@@ -133,7 +142,7 @@ I'll contact my bank directly using the number on my card. Thank you for your co
         Returns:
             HoneypotResult with engagement details
         """
-        settings = get_settings()
+        settings = self._settings
 
         # Shield mode - no engagement
         if mode == "shield":
@@ -167,16 +176,20 @@ I'll contact my bank directly using the number on my card. Thank you for your co
 
         conversation_history: List[HoneypotTurn] = []
         all_entities = initial_entities
-        previous_entity_count = count_entities(initial_entities)
+        entity_count = count_entities(initial_entities)
         no_progress_turns = 0
-        last_messages: List[str] = []
+        last_messages: Deque[Tuple[str, int, int]] = deque(maxlen=3)
+        # Formatted lines of the last 3 turns, kept per engagement for the prompt
+        recent_lines: Deque[str] = deque(maxlen=6)
+        scanned: Dict[bytes, ExtractedData] = {}
 
         current_message = initial_message
 
         for turn in range(1, max_turns + 1):
             try:
                 # Check for repeated pattern (kill-switch)
-                if self._is_repeated_pattern(current_message, last_messages):
+                current_signature = self._message_signature(current_message)
+                if self._is_repeated_pattern(current_signature, last_messages):
                     log_honeypot(request_id, turn - 1, "repeated_pattern")
                     return self._build_result(
                         conversation_history,
@@ -184,17 +197,22 @@ I'll contact my bank directly using the number on my card. Thank you for your co
                         TerminationReason.REPEATED_PATTERN
                     )
 
-                last_messages.append(current_message)
-                if len(last_messages) > 3:
-                    last_messages.pop(0)
+                last_messages.append(current_signature)
 
                 # Generate agent response
-                history_str = self._format_history(conversation_history)
+                history_str = self._format_history(recent_lines)
                 response = await self._generate_response(current_message, history_str)
 
-                # Extract entities from this turn
-                turn_entities = extract_all_entities(current_message + " " + response)
-                all_entities = merge_entities(all_entities, turn_entities)
+                # Extract entities from this turn (text already scanned in this engagement is reused)
+                turn_text = current_message + " " + response
+                text_key = hashlib.blake2b(turn_text.encode("utf-8"), digest_size=16).digest()
+                turn_entities = scanned.get(text_key)
+                if turn_entities is None:
+                    # Regex scanning runs off the event loop so other sessions keep progressing
+                    turn_entities = await asyncio.to_thread(extract_all_entities, turn_text)
+                    scanned[text_key] = turn_entities
+                all_entities, added_entities = merge_entities_counted(all_entities, turn_entities)
+                entity_count += added_entities
 
                 # Record turn
                 conversation_history.append(HoneypotTurn(
@@ -203,14 +221,13 @@ I'll contact my bank directly using the number on my card. Thank you for your co
                     agent_response=response,
                     entities_extracted=turn_entities
                 ))
+                recent_lines.extend((f"Scammer: {current_message}", f"You: {response}"))
 
                 # Check progress (kill-switch)
-                current_entity_count = count_entities(all_entities)
-                if current_entity_count == previous_entity_count:
+                if added_entities == 0:
                     no_progress_turns += 1
                 else:
                     no_progress_turns = 0
-                    previous_entity_count = current_entity_count
 
                 if no_progress_turns >= no_progress_limit:
                     log_honeypot(request_id, turn, "no_new_entities")
@@ -221,7 +238,7 @@ I'll contact my bank directly using the number on my card. Thank you for your co
                     )
 
                 # Check if we have sufficient intelligence
-                if current_entity_count >= 5:
+                if entity_count >= 5:
                     log_honeypot(request_id, turn, "extraction_complete")
                     return self._build_result(
                         conversation_history,
@@ -254,53 +271,58 @@ I'll contact my bank directly using the number on my card. Thank you for your co
         if self._client is None:
             raise RuntimeError("Honeypot model not initialized")
 
-        settings = get_settings()
-        prompt = self.ENGAGEMENT_PROMPT.format(
-            scammer_message=scammer_message,
-            history=history or "No previous conversation"
-        )
+        prompt = "".join((
+            self._PROMPT_PREFIX,
+            scammer_message,
+            self._PROMPT_MIDDLE,
+            history or "No previous conversation",
+            self._PROMPT_SUFFIX
+        ))
 
         response = await self._client.aio.models.generate_content(
-            model=settings.GEMINI_MODEL,
+            model=self._settings.GEMINI_MODEL,
             contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.7,
-                top_p=0.95,
-                max_output_tokens=256,
-            )
+            config=self._generation_config
         )
 
         return response.text.strip()
 
-    def _format_history(self, history: List[HoneypotTurn]) -> str:
-        """Format conversation history for prompt"""
-        if not history:
-            return ""
+    def _format_history(self, recent_lines: Deque[str]) -> str:
+        """Format conversation history for prompt (last 3 turns)"""
+        return "\n".join(recent_lines)
 
-        lines = []
-        for turn in history[-3:]:  # Only last 3 turns for context
-            lines.append(f"Scammer: {turn.scammer_message}")
-            lines.append(f"You: {turn.agent_response}")
+    def _message_signature(self, message: str) -> Tuple[str, int, int]:
+        """
+        Normalize a message and hash its words into a bitset.
 
-        return "\n".join(lines)
+        Words are hashed with crc32, not the builtin hash(), which is salted per
+        process: the kill switch must behave the same in every worker.
 
-    def _is_repeated_pattern(self, current: str, previous: List[str]) -> bool:
-        """Detect if scammer is repeating the same message"""
-        if not previous:
-            return False
+        Returns:
+            Tuple of (normalized message, word bitset with one bit per distinct word,
+            number of set bits)
+        """
+        normalized = message.lower().strip()
+        bits = 0
+        for word in normalized.split():
+            bits |= 1 << (zlib.crc32(word.encode("utf-8")) & WORD_BITSET_MASK)
+        return normalized, bits, bits.bit_count()
 
-        current_normalized = current.lower().strip()
-        for prev in previous:
-            prev_normalized = prev.lower().strip()
+    def _is_repeated_pattern(
+        self,
+        current: Tuple[str, int, int],
+        previous: Iterable[Tuple[str, int, int]]
+    ) -> bool:
+        """Detect if scammer is repeating the same message (signatures from _message_signature)"""
+        current_normalized, current_bits, current_count = current
+        for prev_normalized, prev_bits, prev_count in previous:
             # Check for high similarity (simple approach)
             if current_normalized == prev_normalized:
                 return True
-            # Check if 80% similar words
-            current_words = set(current_normalized.split())
-            prev_words = set(prev_normalized.split())
-            if current_words and prev_words:
-                overlap = len(current_words & prev_words) / max(len(current_words), len(prev_words))
-                if overlap > 0.8:
+            # Check if more than 80% of words are shared (shared / larger > 4/5, in integers)
+            if current_count and prev_count:
+                shared = (current_bits & prev_bits).bit_count()
+                if shared * 5 > max(current_count, prev_count) * 4:
                     return True
 
         return False
@@ -355,6 +377,7 @@ I'll contact my bank directly using the number on my card. Thank you for your co
         return self.SHIELD_RESPONSE
 
 
+@lru_cache(maxsize=1)
 def get_honeypot_agent() -> HoneypotAgent:
     """Get singleton HoneypotAgent instance"""
     return HoneypotAgent()
@@ -3,9 +3,8 @@ BlockSafe Response Builder
 Deterministic JSON response assembly
 """
 
-from datetime import datetime, timezone
+from bisect import bisect_right
 from typing import Optional, Literal
-from uuid import uuid4
 
 from app.api.v1.schemas import (
     AnalysisResponse,
@@ -18,7 +17,14 @@ from app.core.scam_detector import ClassificationResult
 from app.core.ssf_engine import SSFResult
 from app.core.honeypot import HoneypotResult, TerminationReason
 from app.intelligence.voice_analysis import VoiceSignals
+from app.utils.clock import now_iso_ms
 from app.utils.helpers import ExtractedData, count_entities
+from app.utils.ids import new_request_id, new_session_id
+
+
+# Evidence score tiers: confidence >= 0.5/0.7/0.9 adds 1/2/3, entity count >= 1/3 adds 1/2
+_CONFIDENCE_SCORE_CUTS = (0.5, 0.7, 0.9)
+_ENTITY_SCORE_CUTS = (1, 3)
 
 
 class ResponseBuilder:
@@ -56,15 +62,19 @@ class ResponseBuilder:
             Complete AnalysisResponse
         """
         # Generate request ID and timestamp
-        req_id = request_id or str(uuid4())
-        sess_id = session_id or str(uuid4())
-        timestamp = datetime.now(timezone.utc).isoformat()
+        req_id = request_id or new_request_id()
+        sess_id = session_id or new_session_id()
+        timestamp = now_iso_ms()
+
+        # Entities reported and scored: the honeypot's when it engaged, else the message's
+        engaged = honeypot_result is not None and honeypot_result.engaged
+        effective_entities = (
+            honeypot_result.all_entities if engaged else classification.extracted_entities
+        )
+        entity_count = count_entities(effective_entities)
 
         # Build extracted entities
-        entities = ResponseBuilder._build_entities(
-            classification.extracted_entities,
-            honeypot_result
-        )
+        entities = ResponseBuilder._entities_to_model(effective_entities)
 
         # Build SSF profile
         ssf_profile = ResponseBuilder._build_ssf_profile(ssf)
@@ -92,12 +102,12 @@ class ResponseBuilder:
 
         # Calculate evidence level
         evidence_level = ResponseBuilder._calculate_evidence_level(
-            classification, ssf, honeypot_result
+            classification, ssf, engaged, entity_count
         )
 
         # Generate agent summary
         agent_summary = ResponseBuilder._generate_summary(
-            classification, ssf, honeypot_result, mode
+            classification, ssf, honeypot_result, mode, entity_count
         )
 
         return AnalysisResponse(
@@ -118,20 +128,6 @@ class ResponseBuilder:
             operation_mode=mode
         )
 
-    @staticmethod
-    def _build_entities(
-        base: ExtractedData,
-        honeypot_result: Optional[HoneypotResult]
-    ) -> ExtractedEntities:
-        """Combine entities from classification and honeypot"""
-        if honeypot_result and honeypot_result.engaged:
-            # Merge with honeypot-extracted entities
-            all_data = honeypot_result.all_entities
-        else:
-            all_data = base
-
-        return ResponseBuilder._entities_to_model(all_data)
-
     @staticmethod
     def _entities_to_model(data: ExtractedData) -> ExtractedEntities:
         """Convert ExtractedData to Pydantic model"""
@@ -158,97 +154,67 @@ class ResponseBuilder:
     def _calculate_evidence_level(
         classification: ClassificationResult,
         ssf: SSFResult,
-        honeypot_result: Optional[HoneypotResult]
+        engaged: bool,
+        entity_count: int
     ) -> Literal["NONE", "LOW", "MEDIUM", "HIGH"]:
         """
         Calculate overall evidence level based on multiple signals.
+
+        Args:
+            classification: Scam classification result
+            ssf: Scam Strategy Fingerprint result
+            engaged: Whether the honeypot engaged
+            entity_count: Count of the reported entities (honeypot's if engaged)
         """
-        # Calculate entity count
-        entity_count = count_entities(classification.extracted_entities)
-        if honeypot_result and honeypot_result.engaged:
-            entity_count = count_entities(honeypot_result.all_entities)
-        
-        # Non-scam cases
+        # Non-scam cases: financial entities detected = low risk, none = no risk
         if not classification.is_scam:
-            if entity_count > 0:
-                return "LOW"  # Financial entities detected = low risk
-            else:
-                return "NONE"  # No entities = no risk
-        
-        # Scam cases - calculate score
-        score = 0
-        
-        # Confidence contribution
-        if classification.confidence >= 0.9:
-            score += 3
-        elif classification.confidence >= 0.7:
-            score += 2
-        elif classification.confidence >= 0.5:
-            score += 1
-        
-        # Entity contribution
-        if entity_count >= 3:
-            score += 2
-        elif entity_count >= 1:
-            score += 1
-        
-        # SSF contribution
-        if ssf.urgency_score >= 0.7:
-            score += 1
-        if ssf.authority_claims:
-            score += 1
-        if ssf.payment_escalation:
-            score += 1
-        
-        # Honeypot contribution
-        if honeypot_result and honeypot_result.engaged:
-            score += 1
-        
-        # Map to evidence level
+            return "LOW" if entity_count > 0 else "NONE"
+
+        # High confidence is HIGH regardless of the other signals
         if classification.confidence >= 0.8:
             return "HIGH"
-        elif score >= 3:
-            return "MEDIUM"
-        else:
-            return "LOW"
+
+        # Scam cases - score confidence and entity tiers plus one point per signal
+        score = (
+            bisect_right(_CONFIDENCE_SCORE_CUTS, classification.confidence)
+            + bisect_right(_ENTITY_SCORE_CUTS, entity_count)
+            + (ssf.urgency_score >= 0.7)
+            + bool(ssf.authority_claims)
+            + ssf.payment_escalation
+            + engaged
+        )
+        return "MEDIUM" if score >= 3 else "LOW"
 
     @staticmethod
     def _generate_summary(
         classification: ClassificationResult,
         ssf: SSFResult,
         honeypot_result: Optional[HoneypotResult],
-        mode: str
+        mode: str,
+        entity_count: int
     ) -> str:
-        """Generate human-readable analysis summary"""
+        """Generate human-readable analysis summary (entity_count is the honeypot's when engaged)"""
         if not classification.is_scam:
             return "No scam indicators detected. Message appears legitimate with low risk signals."
 
-        parts = []
-
         # Classification summary
         confidence_level = "High" if classification.confidence >= 0.8 else \
                           "Moderate" if classification.confidence >= 0.5 else "Low"
-
-        if classification.scam_type:
-            parts.append(
-                f"{confidence_level}-confidence {classification.scam_type.replace('_', ' ')} detected."
-            )
-        else:
-            parts.append(f"{confidence_level}-confidence scam detected.")
+        scam_label = (classification.scam_type or "scam").replace('_', ' ')
 
         # SSF summary
-        if ssf.strategy_summary and "Direct payment request" not in ssf.strategy_summary:
-            parts.append(ssf.strategy_summary)
+        strategy = ssf.strategy_summary
+        ssf_part = f" {strategy}" if strategy and "Direct payment request" not in strategy else ""
 
         # Honeypot summary
+        honeypot_part = ""
         if honeypot_result:
             if honeypot_result.engaged:
-                entity_count = count_entities(honeypot_result.all_entities)
-                parts.append(
-                    f"Honeypot extracted {entity_count} entities in "
+                honeypot_part = (
+                    f" Honeypot extracted {entity_count} entities in "
                     f"{honeypot_result.turns_completed} turn(s)."
                 )
             elif mode == "shield":
-                parts.append("Shield mode active: user protected without engagement.")
+                honeypot_part = " Shield mode active: user protected without engagement."
 
-        return " ".join(parts)
+        return f"{confidence_level}-confidence {scam_label} detected.{ssf_part}{honeypot_part}"
@@ -0,0 +1,97 @@
+"""
+BlockSafe Result Store
+SQLite-backed TTL store shared by every worker process on a host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from app.utils.logger import logger
+
+
+class SqliteResultStore:
+    """
+    Cross-process key/value store of JSON values with a per-entry TTL.
+
+    The database runs in WAL mode, so Uvicorn/Gunicorn workers can read
+    concurrently while one writes. Calls are blocking and can wait up to
+    BUSY_TIMEOUT on a locked database, so async callers run them in a
+    thread; a lock serializes those threads on the shared connection.
+    Errors are logged and treated as misses so a broken store never fails
+    a request.
+    """
+
+    # Expired rows are purged once every this many writes
+    PURGE_INTERVAL = 256
+
+    # Seconds to wait for another worker's write lock; a missed cache entry
+    # costs less than a stalled request
+    BUSY_TIMEOUT = 0.25
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, ts REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        logger.info(f"Shared result store opened at {path}")
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        Return the stored value for key if present and fresh.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            Decoded JSON value or None
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM results WHERE key = ? AND ts >= ?",
+                    (key, time.time() - self.ttl_seconds)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Result store read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: bytes, value: Any) -> None:
+        """
+        Store a JSON-serializable value under key.
+
+        Args:
+            key: Entry key
+            value: Value to store
+        """
+        payload = json.dumps(value)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, ts, value) VALUES (?, ?, ?)",
+                    (key, time.time(), payload)
+                )
+                self._writes += 1
+                if self._writes % self.PURGE_INTERVAL == 0:
+                    self._conn.execute(
+                        "DELETE FROM results WHERE ts < ?", (time.time() - self.ttl_seconds,)
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Result store write failed: {e}")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
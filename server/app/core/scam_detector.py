@@ -3,22 +3,43 @@ BlockSafe Scam Detector Module
 Gemini-powered scam classification using google-genai
 """
 
+import asyncio
+import hashlib
 import json
+import re
 import time
+from collections import OrderedDict
 from typing import Optional
-from dataclasses import dataclass
-from copy import deepcopy
-
-from google import genai
-from google.genai import types
+from dataclasses import asdict, dataclass, replace
 
 from app.config import get_settings
+from app.core.genai_session import get_genai_client
 from app.utils.logger import logger
-from app.utils.helpers import extract_all_entities, ExtractedData, count_entities
+from app.utils.helpers import extract_all_entities, ExtractedData, count_entities, normalize_message
 from app.core.dataset_manager import get_dataset_manager
+from app.core.result_store import SqliteResultStore
+from app.core.ssf_engine import get_ssf_engine
+
+
+# Reasoning prefix used for fallback results when the Gemini call fails
+CLASSIFICATION_ERROR_PREFIX = "Classification error"
 
+# Deterministic pre-filter: asking the recipient to hand over their own card or
+# banking credentials ("share your CVV") is always a scam (see
+# CLASSIFICATION_PROMPT), unless the message warns against sharing them.
+# Entering an OTP into a site or being sent one is ordinary and left to Gemini
+CREDENTIAL_REQUEST_PATTERN = re.compile(
+    r'\b(?:share|send|tell|provide|give|reply with)\s+(?:(?:us|me)\s+)?your\s+(?:\w+\s+){0,2}?'
+    r'(?:cvv|cvc|card (?:number|no)|atm pin|upi pin|otp)\b',
+    re.IGNORECASE
+)
+NEGATION_PATTERN = re.compile(r"\b(never|not|don't|dont|do not|won't)\b", re.IGNORECASE)
 
-@dataclass
+# Messages shorter than this (stripped) with no entities or urgency skip the LLM
+MIN_CLASSIFIABLE_LENGTH = 10
+
+
+@dataclass(slots=True, frozen=True)
 class ClassificationResult:
     """Result from scam classification"""
     is_scam: bool
@@ -36,9 +57,16 @@ class ScamClassifier:
 
     _instance: Optional["ScamClassifier"] = None
     _client = None
+    _model: Optional[str] = None
+    _generation_config = None
     _configured = False
-    _cache: dict[str, tuple[float, ClassificationResult]] = {}
+    # LRU keyed by message digest so long messages aren't held in memory
+    _cache: "OrderedDict[bytes, tuple[float, ClassificationResult]]" = OrderedDict()
     _cache_ttl: int = 300  # seconds
+    # Optional store shared with other worker processes (CLASSIFIER_CACHE_PATH)
+    _store: Optional[SqliteResultStore] = None
+    # Gemini calls currently running, keyed like the cache
+    _inflight: dict[bytes, asyncio.Future] = {}
     _cache_max: int = 100
 
     CLASSIFICATION_PROMPT = """You are an expert scam detection system. Analyze the following message and determine if it is a scam.
@@ -71,6 +99,13 @@ Respond ONLY with valid JSON in this exact format:
 
 For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="card_fraud"""
 
+    # Constant prompt segments around the message slot (braces unescaped), so
+    # each request is a plain join instead of a str.format parse
+    _PROMPT_PREFIX, _PROMPT_SUFFIX = (
+        part.replace("{{", "{").replace("}}", "}")
+        for part in CLASSIFICATION_PROMPT.split("{message}")
+    )
+
     def __new__(cls) -> "ScamClassifier":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -86,11 +121,28 @@ For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="
         try:
             settings = get_settings()
 
-            # Initialize the new google-genai client
-            ScamClassifier._client = genai.Client(
-                api_key=settings.GEMINI_API_KEY.get_secret_value()
+            # Share the pooled google-genai client (imports the SDK on first use)
+            ScamClassifier._client = get_genai_client()
+
+            from google.genai import types
+
+            # Model and generation config are fixed for the process; build them once
+            ScamClassifier._model = settings.GEMINI_MODEL
+            ScamClassifier._generation_config = types.GenerateContentConfig(
+                temperature=0.0,  # Deterministic output
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=512,  # Reduced for faster response
             )
 
+            if settings.CLASSIFIER_CACHE_PATH:
+                try:
+                    ScamClassifier._store = SqliteResultStore(
+                        settings.CLASSIFIER_CACHE_PATH, ttl_seconds=self._cache_ttl
+                    )
+                except Exception as e:
+                    logger.error(f"Shared classifier cache unavailable, using memory only: {e}")
+
             ScamClassifier._configured = True
             logger.info(f"Scam classifier configured with model: {settings.GEMINI_MODEL}")
 
@@ -113,40 +165,35 @@ For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="
 
         # Extract entities using regex first
         entities = extract_all_entities(message)
-        settings = get_settings()
 
-        # Serve from cache when available and fresh
-        cached = self._get_cached(message)
+        # Unambiguous messages are decided without a Gemini round-trip
+        decided = self._prefilter(message, entities)
+        if decided is not None:
+            logger.debug("Classification decided by pre-filter")
+            return decided
+
+        # Serve from cache when available and fresh; the cache is keyed on the
+        # normalized message, so entities always come from this message
+        key = self._cache_key(message)
+        cached = await self._get_cached(key)
         if cached:
             logger.debug("Classification cache hit")
-            return deepcopy(cached)
+            return self._calibrate_confidence(replace(cached, extracted_entities=entities), entities)
 
         try:
-            # Generate classification using the new API
-            prompt = self.CLASSIFICATION_PROMPT.format(message=message)
-
-            response = await self._client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.0,  # Deterministic output
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=512,  # Reduced for faster response
-                )
-            )
-
-            # Parse JSON response
-            result = self._parse_response(response.text)
-            result.extracted_entities = entities
+            # Concurrent requests for the same message share a single Gemini call
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                logger.debug("Joining in-flight classification")
+                result = await asyncio.shield(inflight)
+            else:
+                result = await self._classify_shared(message, key)
+
+            # Each caller gets its own copy carrying its own entities
+            result = replace(result, extracted_entities=entities)
             
             # Adjust confidence based on detected entities (risk calibration)
-            result = self._calibrate_confidence(result, entities)
-            
-            # Cache successful result
-            self._set_cache(message, result)
-
-            return result
+            return self._calibrate_confidence(result, entities)
 
         except Exception as e:
             logger.error(f"Classification failed: {e}")
@@ -158,20 +205,93 @@ For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="
                 is_scam=False,
                 confidence=base_confidence,
                 scam_type=None,
-                reasoning=f"Classification error: {str(e)}",
+                reasoning=f"{CLASSIFICATION_ERROR_PREFIX}: {str(e)}",
                 extracted_entities=entities
             )
 
+    def _prefilter(self, message: str, entities: ExtractedData) -> Optional[ClassificationResult]:
+        """
+        Classify messages whose verdict is certain from regex signals alone.
+
+        Args:
+            message: The text message to analyze
+            entities: Entities already extracted from message
+
+        Returns:
+            ClassificationResult, or None if Gemini should decide
+        """
+        if (
+            CREDENTIAL_REQUEST_PATTERN.search(message)
+            and not NEGATION_PATTERN.search(message)
+        ):
+            return ClassificationResult(
+                is_scam=True,
+                confidence=0.95,
+                scam_type="card_fraud",
+                reasoning="Deterministic: request for card or banking credentials",
+                extracted_entities=entities
+            )
+
+        if (
+            len(message.strip()) < MIN_CLASSIFIABLE_LENGTH
+            and not count_entities(entities)
+            and not get_ssf_engine().analyze(message).urgency_phrases
+        ):
+            return ClassificationResult(
+                is_scam=False,
+                confidence=0.0,
+                scam_type=None,
+                reasoning="Deterministic: message too short to carry scam indicators",
+                extracted_entities=entities
+            )
+
+        return None
+
+    async def _classify_shared(self, message: str, key: bytes) -> ClassificationResult:
+        """Call Gemini as the leader for key, sharing the outcome with waiting callers"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._generate_classification(message)
+        except asyncio.CancelledError:
+            # Waiters fall back to their own error result
+            future.set_exception(RuntimeError("Shared classification was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark as retrieved so an unawaited future doesn't warn
+            future.exception()
+            raise
+        else:
+            # Cache successful result (before entity-specific calibration)
+            self._set_cache(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _generate_classification(self, message: str) -> ClassificationResult:
+        """Classify message with Gemini (entities are attached by the caller)"""
+        # Generate classification using the new API
+        prompt = "".join((self._PROMPT_PREFIX, message, self._PROMPT_SUFFIX))
+
+        response = await self._client.aio.models.generate_content(
+            model=self._model,
+            contents=prompt,
+            config=self._generation_config
+        )
+
+        # Parse JSON response
+        return self._parse_response(response.text)
+
     def _parse_response(self, response_text: str) -> ClassificationResult:
         """Parse Gemini response into ClassificationResult"""
         try:
-            # Clean response - extract JSON from potential markdown
-            text = response_text.strip()
-            if text.startswith("```"):
-                # Remove markdown code blocks
-                lines = text.split("\n")
-                json_lines = [l for l in lines if not l.startswith("```")]
-                text = "\n".join(json_lines)
+            # Slice out the JSON object, skipping any markdown fences around it
+            start = response_text.find("{")
+            end = response_text.rfind("}")
+            text = response_text[start:end + 1] if 0 <= start < end else response_text
 
             data = json.loads(text)
 
@@ -185,7 +305,7 @@ For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse classification response: {e}")
-            logger.debug(f"Raw response: {response_text}")
+            logger.debug("Raw response: %s", response_text)
 
             # Attempt basic extraction with risk-based confidence
             is_scam = "true" in response_text.lower() and "is_scam" in response_text.lower()
@@ -208,28 +328,48 @@ For card/banking credential requests: is_scam=true, confidence=0.9+, scam_type="
         
         if not result.is_scam and result.confidence == 0.0 and entity_count > 0:
             # Non-scam with financial entities = low but non-zero risk
-            result.confidence = min(0.1 + (entity_count * 0.05), 0.3)
+            result = replace(result, confidence=min(0.1 + (entity_count * 0.05), 0.3))
         
         return result
 
-    def _get_cached(self, message: str) -> Optional[ClassificationResult]:
+    @staticmethod
+    def _cache_key(message: str) -> bytes:
+        """Digest of the normalized message (case, spacing and numbers folded; links and UPI IDs kept)"""
+        return hashlib.blake2b(normalize_message(message).encode("utf-8"), digest_size=16).digest()
+
+    async def _get_cached(self, key: bytes) -> Optional[ClassificationResult]:
         now = time.time()
-        entry = self._cache.get(message)
-        if not entry:
-            return None
-        ts, result = entry
-        if now - ts > self._cache_ttl:
+        entry = self._cache.get(key)
+        if entry:
+            ts, result = entry
+            if now - ts <= self._cache_ttl:
+                self._cache.move_to_end(key)
+                return result
             # Expired
-            self._cache.pop(message, None)
-            return None
-        return result
-
-    def _set_cache(self, message: str, result: ClassificationResult) -> None:
-        # Evict oldest if over max size
-        if len(self._cache) >= self._cache_max:
-            oldest_key = next(iter(self._cache.keys()))
-            self._cache.pop(oldest_key, None)
-        self._cache[message] = (time.time(), deepcopy(result))
+            self._cache.pop(key, None)
+
+        # Fall back to results cached by other worker processes; SQLite can
+        # block on a busy database, so it is queried off the event loop
+        if self._store is not None:
+            data = await asyncio.to_thread(self._store.get, key)
+            if data:
+                return ClassificationResult(extracted_entities=ExtractedData([], [], [], []), **data)
+        return None
+
+    def _set_cache(self, key: bytes, result: ClassificationResult) -> None:
+        # Entities are message-specific and re-extracted on every hit
+        self._cache[key] = (time.time(), replace(result, extracted_entities=ExtractedData([], [], [], [])))
+        self._cache.move_to_end(key)
+        # Evict least recently used if over max size
+        if len(self._cache) > self._cache_max:
+            self._cache.popitem(last=False)
+
+        if self._store is not None:
+            data = asdict(result)
+            del data["extracted_entities"]
+            # Fire-and-forget: the write runs on the default executor and
+            # logs its own errors, so the caller never waits on the lock
+            asyncio.get_running_loop().run_in_executor(None, self._store.set, key, data)
 
     @classmethod
     def is_configured(cls) -> bool:
@@ -0,0 +1,215 @@
+"""
+BlockSafe Semantic Cache
+Approximate-match cache over hashed bag-of-words message embeddings
+"""
+
+import asyncio
+import json
+import os
+import re
+import zlib
+from typing import Any, List, Optional
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from app.utils.logger import logger
+
+
+# Embedding dimensionality (feature-hashing buckets)
+EMBEDDING_DIM = 384
+
+# Embeddings stay float32: numpy's float matmul goes through BLAS, while int8/int16
+# products fall back to unvectorized loops and measure ~6x slower at cache sizes
+EMBEDDING_DTYPE = np.float32
+
+# Word tokens; digit runs are normalized so amounts/numbers don't split near-duplicates
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+")
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Embed text as an L2-normalized hashed bag of unigrams and bigrams.
+
+    Args:
+        text: Text to embed
+
+    Returns:
+        float32 vector of length EMBEDDING_DIM (all zeros for empty text)
+    """
+    tokens = ["#" if tok[0].isdigit() else tok for tok in _TOKEN_PATTERN.findall(text.lower())]
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=EMBEDDING_DTYPE)
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % EMBEDDING_DIM] += 1.0 if h & 0x80000000 else -1.0
+
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class SemanticCache:
+    """
+    Bounded nearest-neighbour cache keyed by normalized embeddings.
+
+    Vectors live in a preallocated matrix so a lookup is one matrix-vector
+    product; once full, the oldest entry is overwritten (FIFO). With a path,
+    the matrix is a memory-mapped .npy file and values are kept in a JSON
+    sidecar, so entries survive restarts. Inserts only mark the cache dirty;
+    one write-back per SAVE_DELAY runs in a thread, and aclose() writes the
+    rest at shutdown.
+    """
+
+    # Seconds from the first unsaved insert to the background write-back
+    SAVE_DELAY = 5.0
+
+    def __init__(
+        self,
+        capacity: int = 2048,
+        threshold: float = 0.92,
+        dim: int = EMBEDDING_DIM,
+        path: Optional[str] = None
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.path = path
+        self._values: List[Any] = [None] * capacity
+        self._size = 0
+        self._next = 0
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        if path:
+            self._vectors = self._open_persistent(path, capacity, dim)
+        else:
+            self._vectors = np.zeros((capacity, dim), dtype=EMBEDDING_DTYPE)
+
+    def _open_persistent(self, path: str, capacity: int, dim: int) -> np.ndarray:
+        """
+        Memory-map the vector matrix from disk and restore values from the sidecar.
+
+        Values must be JSON-serializable. Files with a different shape are replaced.
+        """
+        matrix_path, meta_path = f"{path}.npy", f"{path}.json"
+        os.makedirs(os.path.dirname(os.path.abspath(matrix_path)), exist_ok=True)
+
+        try:
+            vectors = open_memmap(matrix_path, mode="r+")
+            with open(meta_path, "rb") as f:
+                meta = json.loads(f.read())
+            if vectors.shape == (capacity, dim) and vectors.dtype == EMBEDDING_DTYPE:
+                self._size = meta["size"]
+                self._next = meta["next"]
+                self._values[:self._size] = meta["values"]
+                logger.info(f"Loaded {self._size} semantic cache entries from {matrix_path}")
+                return vectors
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"Starting empty semantic cache at {matrix_path}: {e}")
+
+        return open_memmap(matrix_path, mode="w+", dtype=EMBEDDING_DTYPE, shape=(capacity, dim))
+
+    def _write(self, meta: dict) -> None:
+        """
+        Flush the vector file, then atomically replace the sidecar with meta.
+
+        The sidecar is written to a temporary file and renamed over the old
+        one, so a crash leaves either the previous or the new sidecar.
+        """
+        meta_path = f"{self.path}.json"
+        try:
+            self._vectors.flush()
+            payload = json.dumps(meta).encode("utf-8")
+            with open(f"{meta_path}.tmp", "wb") as f:
+                f.write(payload)
+            os.replace(f"{meta_path}.tmp", meta_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to persist semantic cache: {e}")
+
+    def _snapshot(self) -> dict:
+        """Entry count, ring position and values to persist (values list is copied)"""
+        self._dirty = False
+        return {"size": self._size, "next": self._next, "values": self._values[:self._size]}
+
+    def _schedule_save(self) -> None:
+        """Mark the cache dirty and arm one delayed write-back if none is pending"""
+        self._dirty = True
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside an event loop the owner calls save() itself
+            return
+        self._save_handle = loop.call_later(self.SAVE_DELAY, self._start_save, loop)
+
+    def _start_save(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Timer callback: run asave() as a task the cache keeps a reference to"""
+        self._save_handle = None
+        self._save_task = loop.create_task(self.asave())
+
+    def save(self) -> None:
+        """Write unsaved entries to disk, blocking the caller"""
+        if self.path and self._dirty:
+            self._write(self._snapshot())
+
+    async def asave(self) -> None:
+        """Write unsaved entries to disk in a thread"""
+        async with self._save_lock:
+            if self.path and self._dirty:
+                await asyncio.to_thread(self._write, self._snapshot())
+
+    async def aclose(self) -> None:
+        """Cancel the pending write-back and save whatever is still unsaved"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._save_task is not None:
+            await self._save_task
+            self._save_task = None
+        await self.asave()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, vector: np.ndarray) -> Optional[Any]:
+        """
+        Return the value of the most similar entry if cosine >= threshold.
+
+        Args:
+            vector: Normalized query embedding
+
+        Returns:
+            Cached value or None
+        """
+        if self._size == 0:
+            return None
+
+        similarities = self._vectors[:self._size] @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self._values[best]
+        return None
+
+    def insert(self, vector: np.ndarray, value: Any) -> None:
+        """
+        Insert an entry, evicting the oldest one when full.
+
+        Args:
+            vector: Normalized embedding
+            value: Value to cache
+        """
+        if not vector.any():
+            return
+
+        self._vectors[self._next] = vector
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+        if self.path:
+            self._schedule_save()
+
@@ -4,7 +4,8 @@ Behavioral pattern analysis for ecosystem-wide learning
 """
 
 import re
-from typing import Optional, List
+from functools import lru_cache
+from typing import Dict, Optional, List, Sequence, Set, Tuple
 from dataclasses import dataclass
 
 
@@ -13,7 +14,110 @@ from app.intelligence.voice_analysis import VoiceSignals
 from app.utils.logger import logger
 
 
-@dataclass
+# Word tokens used to skip patterns whose leading word is absent from the text
+WORD_PATTERN = re.compile(r'\w+')
+
+# SSF patterns that are nothing but an alternation of lowercase words
+WORD_LIST_PATTERN = re.compile(r'\\b\((?:[a-z]+\|)*[a-z]+\)\\b')
+
+# The only non-ASCII characters re.IGNORECASE matches against ASCII letters
+# ('İ' would also lower() to two characters and shift token boundaries)
+_IGNORECASE_ASCII_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+# Text signals of empty or whitespace-only text, where no pattern can match
+_NO_TEXT_SIGNALS = ((), (), False, None)
+
+
+def _split_alternatives(alternation: str) -> List[str]:
+    """Split a regex alternation on its top-level '|' characters"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(alternation):
+        if char == '(' and alternation[i - 1:i] != '\\':
+            depth += 1
+        elif char == ')' and alternation[i - 1:i] != '\\':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            parts.append(alternation[start:i])
+            start = i + 1
+    parts.append(alternation[start:])
+    return parts
+
+
+def _leading_words(alternative: str) -> Optional[Set[str]]:
+    """
+    Possible first words of a match of one alternative (None if unknown).
+
+    Understands the small regex subset used by the SSF patterns: literal
+    lowercase words, a trailing optional letter ('expires?'), and plain or
+    optional non-capturing groups ('pay(?:ment)?', '(?:hdfc|sbi) bank').
+    """
+    if alternative.startswith('(?:'):
+        return _expand_group('', alternative)
+
+    word = re.match(r'[a-z]*', alternative).group()
+    rest = alternative[len(word):]
+    if rest.startswith('?') and word:
+        with_last = _leading_words(word + rest[1:])
+        without_last = _leading_words(word[:-1] + rest[1:])
+        if with_last is None or without_last is None:
+            return None
+        return with_last | without_last
+    if rest.startswith('(?:'):
+        return _expand_group(word, rest)
+    if word and (not rest or rest[0] == ' ' or rest.startswith(("\\'", '\\.'))):
+        return {word}
+    return None
+
+
+def _expand_group(prefix: str, text: str) -> Optional[Set[str]]:
+    """Leading words of prefix + a '(?:...)' group (optionally followed by '?') + rest"""
+    depth = 0
+    for end, char in enumerate(text):
+        depth += char == '('
+        depth -= char == ')'
+        if depth == 0:
+            break
+    rest = text[end + 1:]
+    variants = [prefix + alt + rest.lstrip('?') for alt in _split_alternatives(text[3:end])]
+    if rest.startswith('?'):
+        variants.append(prefix + rest[1:])
+
+    words: Set[str] = set()
+    for variant in variants:
+        found = _leading_words(variant)
+        if found is None:
+            return None
+        words |= found
+    return words
+
+
+def _first_words(pattern: str) -> Optional[frozenset]:
+    """First words any match of a '\\b(...)\\b' pattern must start with (None = always run)"""
+    if not (pattern.startswith('\\b(') and pattern.endswith(')\\b')):
+        return None
+    words: Set[str] = set()
+    for alternative in _split_alternatives(pattern[3:-3]):
+        found = _leading_words(alternative)
+        if not found:
+            return None
+        words |= found
+    return frozenset(words)
+
+
+def _compile_pattern(pattern: str) -> Tuple[re.Pattern, Optional[frozenset], bool]:
+    """
+    Compile an SSF pattern together with its first words, and whether it is a
+    plain list of single words ('\\b(rbi|jio)\\b'), in which case it matches
+    exactly when one of those words is a token of the text.
+
+    Patterns are lowercase and run on text folded by SSFEngine._fold, which
+    matches what re.IGNORECASE would without case folding inside the engine.
+    """
+    words_only = WORD_LIST_PATTERN.fullmatch(pattern) is not None
+    return re.compile(pattern), _first_words(pattern), words_only
+
+
+@dataclass(slots=True, frozen=True)
 class SSFResult:
     """Scam Strategy Fingerprint result"""
     urgency_score: float
@@ -36,6 +140,9 @@ class SSFEngine:
     - Channel-switching intent
     """
 
+    # Urgency phrases reported per result (the score saturates at 5)
+    MAX_URGENCY_PHRASES = 10
+
     # Urgency phrase patterns
     URGENCY_PATTERNS = [
         r'\b(immediate(?:ly)?|urgent(?:ly)?|right now|act now|don\'t delay)\b',
@@ -76,25 +183,51 @@ class SSFEngine:
         r'\b(refund|cashback|prize|reward|lottery)\b',
     ]
 
+    # Patterns are compiled once at import (shared copy-on-write by forked
+    # workers), each paired with the set of words a match must start with so
+    # analyze() can tokenize the text once and only search patterns that can match
+    _urgency_compiled = [_compile_pattern(p) for p in URGENCY_PATTERNS]
+    _authority_compiled = {k: _compile_pattern(v) for k, v in AUTHORITY_PATTERNS.items()}
+    _channel_compiled = {k: _compile_pattern(v) for k, v in CHANNEL_PATTERNS.items()}
+    _payment_compiled = [_compile_pattern(p) for p in PAYMENT_PATTERNS]
+
     def __init__(self):
-        self._compile_patterns()
-
-    def _compile_patterns(self) -> None:
-        """Compile regex patterns for efficiency"""
-        self._urgency_compiled = [
-            re.compile(p, re.IGNORECASE) for p in self.URGENCY_PATTERNS
-        ]
-        self._authority_compiled = {
-            k: re.compile(v, re.IGNORECASE)
-            for k, v in self.AUTHORITY_PATTERNS.items()
-        }
-        self._channel_compiled = {
-            k: re.compile(v, re.IGNORECASE)
-            for k, v in self.CHANNEL_PATTERNS.items()
-        }
-        self._payment_compiled = [
-            re.compile(p, re.IGNORECASE) for p in self.PAYMENT_PATTERNS
-        ]
+        # Text-derived signals are pure, so repeated messages (retries, batch
+        # uploads, replays) skip the regex work; voice is layered on per call
+        self._analyze_text_cached = lru_cache(maxsize=1024)(self._analyze_text_only)
+
+    @staticmethod
+    def _fold(text: str) -> str:
+        """
+        Lowercase text so the lowercase patterns match it as re.IGNORECASE would.
+
+        Non-ASCII text first has the few letters re.IGNORECASE folds onto
+        ASCII ones (e.g. 'ſ', 'K') mapped to them, which str.lower() does not
+        do. Every other character lowercases to exactly one character of the
+        same word class, so the folded text lines up index for index with the
+        original and \\b anchors fall in the same places.
+        """
+        if not text.isascii():
+            text = text.translate(_IGNORECASE_ASCII_FOLD)
+        return text.lower()
+
+    @staticmethod
+    def _may_match(first_words: Optional[frozenset], tokens: Set[str]) -> bool:
+        """Whether a pattern can match given the text's tokens"""
+        return first_words is None or not first_words.isdisjoint(tokens)
+
+    @classmethod
+    def _search(
+        cls,
+        compiled: Tuple[re.Pattern, Optional[frozenset], bool],
+        folded: str,
+        tokens: Set[str]
+    ) -> bool:
+        """Whether a compiled pattern matches folded text; word lists are decided by the tokens alone"""
+        pattern, first_words, words_only = compiled
+        if not cls._may_match(first_words, tokens):
+            return False
+        return words_only or pattern.search(folded) is not None
 
     def analyze(
         self,
@@ -111,23 +244,46 @@ class SSFEngine:
         Returns:
             SSFResult with fingerprint data
         """
-        # Detect urgency phrases
-        urgency_phrases = self._detect_urgency_phrases(text)
+        return self._build_result(self._text_signals(text), voice_signals)
+
+    def analyze_batch(self, texts: Sequence[str]) -> List[SSFResult]:
+        """
+        Analyze several messages at once (e.g. an SMS inbox).
+
+        Inboxes repeat the same templates, so each distinct text is scanned
+        at most once per batch, even when the batch outgrows the text cache.
+
+        Args:
+            texts: Message texts to analyze
+
+        Returns:
+            List of SSFResult in input order
+        """
+        text_signals = {text: self._text_signals(text) for text in dict.fromkeys(texts)}
+        return [self._build_result(text_signals[text], None) for text in texts]
+
+    def _text_signals(self, text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], bool, Optional[str]]:
+        """Cached text signals; blank text is answered without scanning or caching it"""
+        if not text or text.isspace():
+            return _NO_TEXT_SIGNALS
+        return self._analyze_text_cached(text)
+
+    def _build_result(
+        self,
+        text_signals: Tuple[Tuple[str, ...], Tuple[str, ...], bool, Optional[str]],
+        voice_signals: Optional[VoiceSignals]
+    ) -> SSFResult:
+        """Combine cached text signals and optional voice signals into an SSFResult"""
+        urgency_phrases, authority_claims, payment_escalation, channel_switch_intent = text_signals
+        # Callers get their own lists, never the cached tuples
+        urgency_phrases = list(urgency_phrases)
+        authority_claims = list(authority_claims)
 
         # Calculate urgency score (0-1)
         urgency_score = self._calculate_urgency_score(
             urgency_phrases, voice_signals
         )
 
-        # Detect authority claims
-        authority_claims = self._detect_authority_claims(text)
-
-        # Detect payment escalation indicators
-        payment_escalation = self._detect_payment_escalation(text)
-
-        # Detect channel switch intent
-        channel_switch_intent = self._detect_channel_switch(text)
-
         # Generate strategy summary
         strategy_summary = self._generate_summary(
             urgency_score=urgency_score,
@@ -142,17 +298,49 @@ class SSFEngine:
             authority_claims=authority_claims,
             payment_escalation=payment_escalation,
             channel_switch_intent=channel_switch_intent,
-            urgency_phrases=urgency_phrases[:10],  # Limit to top 10
+            urgency_phrases=urgency_phrases[:self.MAX_URGENCY_PHRASES],
             strategy_summary=strategy_summary
         )
 
-    def _detect_urgency_phrases(self, text: str) -> List[str]:
-        """Extract urgency phrases from text"""
-        phrases = []
-        for pattern in self._urgency_compiled:
-            matches = pattern.findall(text)
-            phrases.extend(matches)
-        return list(set(phrases))
+    def _analyze_text_only(
+        self,
+        text: str
+    ) -> Tuple[Tuple[str, ...], Tuple[str, ...], bool, Optional[str]]:
+        """
+        Run the regex detectors over text (cached per instance).
+
+        Returns:
+            (urgency_phrases, authority_claims, payment_escalation, channel_switch_intent)
+        """
+        # Fold case and tokenize once; patterns run case-sensitively on the
+        # folded text, and those whose leading words are absent are skipped
+        folded = self._fold(text)
+        tokens = set(WORD_PATTERN.findall(folded))
+
+        return (
+            tuple(self._detect_urgency_phrases(text, folded, tokens)),
+            tuple(self._detect_authority_claims(folded, tokens)),
+            self._detect_payment_escalation(folded, tokens),
+            self._detect_channel_switch(folded, tokens)
+        )
+
+    def _detect_urgency_phrases(self, text: str, folded: str, tokens: Set[str]) -> List[str]:
+        """
+        Extract urgency phrases, as written in text, by searching its folded form.
+
+        Phrases are deduplicated in order of pattern and position, so the
+        scan stops once MAX_URGENCY_PHRASES distinct phrases are found: later
+        ones could never be reported, and the score saturates well before.
+        """
+        phrases: Dict[str, None] = {}
+        for pattern, first_words, _ in self._urgency_compiled:
+            if self._may_match(first_words, tokens):
+                for match in pattern.finditer(folded):
+                    start, end = match.span(1)
+                    phrases[text[start:end]] = None
+                    if len(phrases) >= self.MAX_URGENCY_PHRASES:
+                        return list(phrases)
+        return list(phrases)
 
     def _calculate_urgency_score(
         self,
@@ -180,27 +368,29 @@ class SSFEngine:
 
         return min(phrase_score + voice_score, 1.0)
 
-    def _detect_authority_claims(self, text: str) -> List[str]:
+    def _detect_authority_claims(self, folded: str, tokens: Set[str]) -> List[str]:
         """Detect claimed authority figures"""
         claims = []
-        for authority, pattern in self._authority_compiled.items():
-            if pattern.search(text):
+        for authority, compiled in self._authority_compiled.items():
+            if self._search(compiled, folded, tokens):
                 claims.append(authority)
         return claims
 
-    def _detect_payment_escalation(self, text: str) -> bool:
+    def _detect_payment_escalation(self, folded: str, tokens: Set[str]) -> bool:
         """Detect if payment demands are present"""
         payment_count = 0
-        for pattern in self._payment_compiled:
-            if pattern.search(text):
+        for compiled in self._payment_compiled:
+            if self._search(compiled, folded, tokens):
                 payment_count += 1
-        # Escalation if multiple payment indicators
-        return payment_count >= 2
+                # Escalation if multiple payment indicators
+                if payment_count >= 2:
+                    return True
+        return False
 
-    def _detect_channel_switch(self, text: str) -> Optional[str]:
+    def _detect_channel_switch(self, folded: str, tokens: Set[str]) -> Optional[str]:
         """Detect intent to switch communication channels"""
-        for channel, pattern in self._channel_compiled.items():
-            if pattern.search(text):
+        for channel, compiled in self._channel_compiled.items():
+            if self._search(compiled, folded, tokens):
                 return channel
         return None
 
@@ -240,13 +430,7 @@ class SSFEngine:
         return ". ".join(parts) + "."
 
 
-# Module-level instance
-_ssf_engine: Optional[SSFEngine] = None
-
-
+@lru_cache(maxsize=1)
 def get_ssf_engine() -> SSFEngine:
     """Get SSFEngine instance"""
-    global _ssf_engine
-    if _ssf_engine is None:
-        _ssf_engine = SSFEngine()
-    return _ssf_engine
+    return SSFEngine()
@@ -0,0 +1,31 @@
+"""
+BlockSafe Audio Worker Pool
+Shared executor and admission control for CPU-bound audio work
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from app.config import get_settings
+
+
+@lru_cache()
+def get_audio_executor() -> ThreadPoolExecutor:
+    """
+    Executor shared by transcription and voice analysis, so the GIL-releasing
+    Whisper/librosa native code of concurrent requests runs in parallel
+    instead of queueing behind two disjoint 2-thread pools.
+    """
+    settings = get_settings()
+    return ThreadPoolExecutor(
+        max_workers=max(1, min(os.cpu_count() or 1, settings.MAX_AUDIO_CONCURRENCY)),
+        thread_name_prefix="audio"
+    )
+
+
+@lru_cache()
+def get_audio_slots() -> asyncio.Semaphore:
+    """Audio requests in flight; each runs at most one job on the pool at a time"""
+    return asyncio.Semaphore(get_settings().MAX_AUDIO_CONCURRENCY)
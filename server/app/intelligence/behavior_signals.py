@@ -3,14 +3,15 @@ BlockSafe Behavior Signals Module
 Behavioral pattern detection and analysis
 """
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
 from app.intelligence.text_analysis import TextSignals
 from app.intelligence.voice_analysis import VoiceSignals
 
 
-@dataclass
+@dataclass(slots=True)
 class BehaviorProfile:
     """Combined behavioral profile from multiple signal sources"""
     manipulation_score: float  # 0-1, how manipulative the communication is
@@ -42,6 +43,19 @@ class BehaviorAnalyzer:
         "impersonation": ["this is", "i am from", "calling from"],
     }
 
+    # Texts shorter than the shortest keyword cannot match any of them
+    MIN_KEYWORD_LENGTH = min(
+        len(keyword)
+        for table in (PRESSURE_TACTICS, SE_INDICATORS)
+        for keywords in table.values()
+        for keyword in keywords
+    )
+
+    def __init__(self):
+        # Keyword hits depend only on the text, so repeated messages skip the
+        # scans; scoring still uses each call's text and voice signals
+        self._detect_cached = lru_cache(maxsize=1024)(self._detect_keywords)
+
     def analyze(
         self,
         text: str,
@@ -59,19 +73,10 @@ class BehaviorAnalyzer:
         Returns:
             BehaviorProfile with manipulation assessment
         """
-        text_lower = text.lower()
-
-        # Detect pressure tactics
-        detected_tactics = []
-        for tactic, keywords in self.PRESSURE_TACTICS.items():
-            if any(kw in text_lower for kw in keywords):
-                detected_tactics.append(tactic)
-
-        # Detect SE indicators
-        se_indicators = []
-        for indicator, phrases in self.SE_INDICATORS.items():
-            if any(phrase in text_lower for phrase in phrases):
-                se_indicators.append(indicator)
+        detected_tactics, se_indicators = self._detect_cached(text)
+        # Callers get their own lists, never the cached tuples
+        detected_tactics = list(detected_tactics)
+        se_indicators = list(se_indicators)
 
         # Calculate manipulation score
         manipulation_score = self._calculate_manipulation_score(
@@ -91,6 +96,34 @@ class BehaviorAnalyzer:
             risk_level=risk_level
         )
 
+    def _detect_keywords(self, text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Detect pressure tactics and SE indicators mentioned in text.
+
+        Returns:
+            Tuple of (pressure tactics, SE indicators)
+        """
+        text_lower = text.lower()
+        if len(text_lower) < self.MIN_KEYWORD_LENGTH:
+            return (), ()
+
+        # Bound method: each keyword test is a C-level substring search
+        contains = text_lower.__contains__
+
+        # Detect pressure tactics
+        detected_tactics = tuple(
+            tactic for tactic, keywords in self.PRESSURE_TACTICS.items()
+            if any(map(contains, keywords))
+        )
+
+        # Detect SE indicators
+        se_indicators = tuple(
+            indicator for indicator, phrases in self.SE_INDICATORS.items()
+            if any(map(contains, phrases))
+        )
+
+        return detected_tactics, se_indicators
+
     def _calculate_manipulation_score(
         self,
         tactics: List[str],
@@ -136,12 +169,9 @@ class BehaviorAnalyzer:
 
 
 # Module-level instance
-_behavior_analyzer: Optional[BehaviorAnalyzer] = None
+_behavior_analyzer = BehaviorAnalyzer()
 
 
 def get_behavior_analyzer() -> BehaviorAnalyzer:
     """Get BehaviorAnalyzer instance"""
-    global _behavior_analyzer
-    if _behavior_analyzer is None:
-        _behavior_analyzer = BehaviorAnalyzer()
     return _behavior_analyzer
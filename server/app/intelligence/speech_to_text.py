@@ -4,13 +4,12 @@ Whisper-based audio transcription with singleton model loading
 """
 
 import io
-import tempfile
 import os
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple, Union
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 from app.config import get_settings
+from app.intelligence.audio_pool import get_audio_executor
 from app.utils.logger import logger
 
 
@@ -22,7 +21,6 @@ class WhisperTranscriber:
 
     _instance: Optional["WhisperTranscriber"] = None
     _model = None
-    _executor = ThreadPoolExecutor(max_workers=2)
 
     def __new__(cls) -> "WhisperTranscriber":
         if cls._instance is None:
@@ -45,7 +43,9 @@ class WhisperTranscriber:
             WhisperTranscriber._model = WhisperModel(
                 settings.WHISPER_MODEL_SIZE,
                 device=settings.WHISPER_DEVICE,
-                compute_type=settings.WHISPER_COMPUTE_TYPE
+                compute_type=settings.WHISPER_COMPUTE_TYPE,
+                cpu_threads=settings.WHISPER_CPU_THREADS or os.cpu_count() or 0,
+                num_workers=settings.WHISPER_NUM_WORKERS
             )
 
             logger.info("Whisper model loaded successfully")
@@ -53,10 +53,13 @@ class WhisperTranscriber:
             logger.error(f"Failed to load Whisper model: {e}")
             raise RuntimeError(f"Whisper initialization failed: {e}")
 
-    def _transcribe_sync(self, audio_path: str) -> Tuple[str, dict]:
+    def _transcribe_sync(self, audio: Union[str, BinaryIO]) -> Tuple[str, dict]:
         """
         Synchronous transcription (runs in thread pool).
 
+        Args:
+            audio: Audio file path or in-memory file object
+
         Returns:
             Tuple of (transcript, metadata)
         """
@@ -64,7 +67,7 @@ class WhisperTranscriber:
             raise RuntimeError("Whisper model not initialized")
 
         segments, info = self._model.transcribe(
-            audio_path,
+            audio,
             beam_size=5,
             language="en",  # Can be made configurable
             vad_filter=True,  # Voice activity detection
@@ -98,26 +101,17 @@ class WhisperTranscriber:
         Returns:
             Tuple of (transcript, metadata)
         """
-        # Write to temporary file (faster-whisper needs file path)
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
-
-        try:
-            # Run transcription in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            transcript, metadata = await loop.run_in_executor(
-                self._executor,
-                self._transcribe_sync,
-                tmp_path
-            )
-            return transcript, metadata
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(tmp_path)
-            except Exception:
-                pass
+        # Decode straight from memory (faster-whisper accepts file objects)
+        audio_file = io.BytesIO(audio_bytes)
+
+        # Run transcription in thread pool to avoid blocking
+        loop = asyncio.get_event_loop()
+        transcript, metadata = await loop.run_in_executor(
+            get_audio_executor(),
+            self._transcribe_sync,
+            audio_file
+        )
+        return transcript, metadata
 
     @classmethod
     def is_loaded(cls) -> bool:
@@ -4,11 +4,21 @@ Text-based intelligence extraction and analysis
 """
 
 import re
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import string
+from functools import lru_cache
+from typing import List, Dict, Tuple
+from dataclasses import dataclass, replace
 
 
-@dataclass
+# ASCII letters; for ASCII text these are exactly the isalpha()/isupper() characters
+_ASCII_UPPER = string.ascii_uppercase.encode()
+_ASCII_LETTERS = string.ascii_letters.encode()
+
+# Sentence terminators
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+
+@dataclass(slots=True)
 class TextSignals:
     """Text-based signals for analysis"""
     word_count: int
@@ -45,6 +55,13 @@ class TextAnalyzer:
         "court", "lawsuit", "action"
     ]
 
+    # Texts shorter than the shortest keyword cannot match any of them
+    MIN_KEYWORD_LENGTH = min(map(len, SUSPICIOUS_KEYWORDS))
+
+    def __init__(self):
+        # Signals depend only on the text, so repeated messages skip the scans
+        self._analyze_cached = lru_cache(maxsize=1024)(self._analyze_uncached)
+
     def analyze(self, text: str) -> TextSignals:
         """
         Analyze text for various signals.
@@ -55,17 +72,22 @@ class TextAnalyzer:
         Returns:
             TextSignals dataclass with analysis results
         """
+        signals = self._analyze_cached(text)
+        # Callers get their own copy, never the cached instance
+        return replace(signals, suspicious_keywords=list(signals.suspicious_keywords))
+
+    def _analyze_uncached(self, text: str) -> TextSignals:
+        """Compute TextSignals for text (memoized by analyze)"""
         # Basic counts
         words = text.split()
         word_count = len(words)
 
-        # Sentence analysis
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sentence_count = len(sentences)
+        # Sentence analysis: one split per sentence; blank sentences have no words
+        sentence_lengths = [len(s.split()) for s in SENTENCE_SPLIT_PATTERN.split(text)]
+        sentence_count = len(sentence_lengths) - sentence_lengths.count(0)
 
         avg_sentence_length = (
-            sum(len(s.split()) for s in sentences) / sentence_count
+            sum(sentence_lengths) / sentence_count
             if sentence_count > 0 else 0
         )
 
@@ -74,18 +96,15 @@ class TextAnalyzer:
         question_count = text.count('?')
 
         # Caps analysis
-        alpha_chars = [c for c in text if c.isalpha()]
-        caps_ratio = (
-            sum(1 for c in alpha_chars if c.isupper()) / len(alpha_chars)
-            if alpha_chars else 0
-        )
+        alpha_count, upper_count = self._count_letters(text)
+        caps_ratio = upper_count / alpha_count if alpha_count else 0
 
-        # Keyword detection
+        # Keyword detection: C-level substring search per keyword (keywords are unique)
         text_lower = text.lower()
-        suspicious_keywords = [
-            kw for kw in self.SUSPICIOUS_KEYWORDS
-            if kw in text_lower
-        ]
+        suspicious_keywords = (
+            list(filter(text_lower.__contains__, self.SUSPICIOUS_KEYWORDS))
+            if len(text_lower) >= self.MIN_KEYWORD_LENGTH else []
+        )
 
         return TextSignals(
             word_count=word_count,
@@ -94,9 +113,30 @@ class TextAnalyzer:
             exclamation_count=exclamation_count,
             question_count=question_count,
             caps_ratio=round(caps_ratio, 3),
-            suspicious_keywords=list(set(suspicious_keywords))
+            suspicious_keywords=suspicious_keywords
         )
 
+    @staticmethod
+    def _count_letters(text: str) -> Tuple[int, int]:
+        """
+        Count alphabetic and uppercase alphabetic characters.
+
+        ASCII text (the common case) is counted in C by deleting letters from
+        its bytes and comparing lengths; other text is walked per character.
+
+        Returns:
+            Tuple of (alpha count, uppercase alpha count)
+        """
+        if text.isascii():
+            data = text.encode("ascii")
+            return (
+                len(data) - len(data.translate(None, _ASCII_LETTERS)),
+                len(data) - len(data.translate(None, _ASCII_UPPER))
+            )
+
+        alpha_chars = [c for c in text if c.isalpha()]
+        return len(alpha_chars), sum(1 for c in alpha_chars if c.isupper())
+
     def calculate_scam_likelihood(self, signals: TextSignals) -> float:
         """
         Calculate basic scam likelihood from text signals.
@@ -130,12 +170,9 @@ class TextAnalyzer:
 
 
 # Module-level instance
-_text_analyzer: Optional[TextAnalyzer] = None
+_text_analyzer = TextAnalyzer()
 
 
 def get_text_analyzer() -> TextAnalyzer:
     """Get TextAnalyzer instance"""
-    global _text_analyzer
-    if _text_analyzer is None:
-        _text_analyzer = TextAnalyzer()
     return _text_analyzer
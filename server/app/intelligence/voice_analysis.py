@@ -3,17 +3,21 @@ BlockSafe Voice Analysis Module
 Audio feature extraction for cross-modal intelligence
 """
 
+import io
 import tempfile
 import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, List
+from collections import Counter
+from typing import List, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+from app.intelligence.audio_pool import get_audio_executor
 from app.utils.logger import logger
 
 
-@dataclass
+@dataclass(slots=True)
 class VoiceSignals:
     """Voice-based signals for SSF integration"""
     speech_rate: float  # Words per minute (estimated)
@@ -29,36 +33,92 @@ class VoiceAnalyzer:
     Feeds into Scam Strategy Fingerprint (SSF).
     """
 
-    _executor = ThreadPoolExecutor(max_workers=2)
+    # Sample rate audio is resampled to before analysis
+    ANALYSIS_SAMPLE_RATE = 16000
+
+    # Samples per energy block for silence detection (librosa's default hop)
+    ENERGY_BLOCK = 512
+
+    @classmethod
+    def preload(cls) -> None:
+        """
+        Import librosa and run its resampler once (call at startup).
+
+        librosa is imported on first use because it takes seconds to load;
+        preloading moves that cost, and any missing-dependency error, from
+        the first audio request to startup.
+        """
+        import librosa
+
+        librosa.resample(
+            np.zeros(cls.ANALYSIS_SAMPLE_RATE, dtype=np.float32),
+            orig_sr=cls.ANALYSIS_SAMPLE_RATE * 3,
+            target_sr=cls.ANALYSIS_SAMPLE_RATE,
+            res_type="soxr_qq"
+        )
+        logger.info("librosa preloaded and ready")
+
+    def _load_audio(self, audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+        """
+        Decode audio as 16 kHz mono; energy and speech rate need no more.
+
+        Formats libsndfile reads (wav, flac, ogg, mp3) are decoded straight
+        from memory. Others (m4a, webm) fall back to audioread, which needs a
+        file path, so only those go through a temporary file.
+
+        Args:
+            audio_bytes: Raw audio file bytes
 
-    def _analyze_sync(self, audio_path: str, transcript: str) -> VoiceSignals:
+        Returns:
+            Tuple of (samples, sample_rate)
+        """
+        import librosa
+
+        load_args = dict(sr=self.ANALYSIS_SAMPLE_RATE, mono=True, res_type="soxr_qq")
+        try:
+            return librosa.load(io.BytesIO(audio_bytes), **load_args)
+        except RuntimeError:
+            pass
+
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+            tmp_file.write(audio_bytes)
+            tmp_path = tmp_file.name
+        try:
+            return librosa.load(tmp_path, **load_args)
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except Exception:
+                pass
+
+    def _analyze_sync(self, audio_bytes: bytes, transcript: str) -> VoiceSignals:
         """
         Synchronous audio analysis using librosa.
 
         Args:
-            audio_path: Path to audio file
+            audio_bytes: Raw audio file bytes
             transcript: Transcribed text for word count
 
         Returns:
             VoiceSignals dataclass
         """
         try:
-            import librosa
-            import numpy as np
-
-            # Load audio
-            y, sr = librosa.load(audio_path, sr=None)
-            duration = librosa.get_duration(y=y, sr=sr)
+            y, sr = self._load_audio(audio_bytes)
+            duration = len(y) / sr if sr else 0.0
 
             # Calculate speech rate (words per minute)
             word_count = len(transcript.split()) if transcript else 0
             speech_rate = (word_count / duration * 60) if duration > 0 else 0
 
-            # Detect silence ratio using RMS energy
-            rms = librosa.feature.rms(y=y)[0]
-            silence_threshold = np.percentile(rms, 10)
-            silence_frames = np.sum(rms < silence_threshold)
-            silence_ratio = silence_frames / len(rms) if len(rms) > 0 else 0
+            # Detect silence ratio using mean-square energy of non-overlapping
+            # blocks (a strided view, so no per-frame copy as in librosa's rms)
+            n = len(y) // self.ENERGY_BLOCK * self.ENERGY_BLOCK
+            energy = (y[:n].astype(np.float32, copy=False).reshape(-1, self.ENERGY_BLOCK) ** 2).mean(axis=1)
+            if len(energy) > 0:
+                silence_threshold = np.quantile(energy, 0.10)
+                silence_ratio = float((energy < silence_threshold).mean())
+            else:
+                silence_ratio = 0
 
             # Urgency indicators based on speech characteristics
             urgency_indicators = []
@@ -117,18 +177,9 @@ class VoiceAnalyzer:
         if len(words) < 6:
             return False
 
-        # Check for repeated 3-grams
-        trigrams = [' '.join(words[i:i+3]) for i in range(len(words) - 2)]
-        trigram_counts = {}
-        for tg in trigrams:
-            trigram_counts[tg] = trigram_counts.get(tg, 0) + 1
-
-        # If any trigram appears more than threshold times
-        for count in trigram_counts.values():
-            if count >= threshold:
-                return True
-
-        return False
+        # Check for repeated 3-grams (word tuples, so no joined string per trigram)
+        top = Counter(zip(words, words[1:], words[2:])).most_common(1)
+        return top[0][1] >= threshold
 
     async def analyze(self, audio_bytes: bytes, transcript: str) -> VoiceSignals:
         """
@@ -141,34 +192,19 @@ class VoiceAnalyzer:
         Returns:
             VoiceSignals dataclass
         """
-        # Write to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
-
-        try:
-            loop = asyncio.get_event_loop()
-            signals = await loop.run_in_executor(
-                self._executor,
-                self._analyze_sync,
-                tmp_path,
-                transcript
-            )
-            return signals
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except Exception:
-                pass
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            get_audio_executor(),
+            self._analyze_sync,
+            audio_bytes,
+            transcript
+        )
 
 
 # Module-level instance
-_voice_analyzer: Optional[VoiceAnalyzer] = None
+_voice_analyzer = VoiceAnalyzer()
 
 
 def get_voice_analyzer() -> VoiceAnalyzer:
     """Get VoiceAnalyzer instance"""
-    global _voice_analyzer
-    if _voice_analyzer is None:
-        _voice_analyzer = VoiceAnalyzer()
     return _voice_analyzer
@@ -3,7 +3,8 @@ BlockSafe Main Application
 FastAPI application with lifespan management
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, HTTPException
@@ -14,6 +15,9 @@ from starlette import status
 
 from app.config import get_settings
 from app.api.v1.routes import router as api_router, health_router
+from app.api.v1.upload_limit import AudioUploadLimitMiddleware
+from app.core.genai_session import close_genai_client
+from app.utils.clock import run_clock
 from app.utils.logger import logger
 
 
@@ -38,26 +42,58 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         from app.intelligence.speech_to_text import WhisperTranscriber
         if WhisperTranscriber.is_loaded():
             logger.info("Whisper model already loaded")
+        elif settings.WHISPER_PRELOAD:
+            await asyncio.to_thread(WhisperTranscriber.preload)
         else:
             logger.info("Whisper model will be lazy-loaded on first audio request")
     except Exception as e:
         logger.warning(f"Whisper preload skipped: {e}")
 
+    # Pre-load librosa for voice analysis alongside Whisper
+    if settings.WHISPER_PRELOAD:
+        try:
+            from app.intelligence.voice_analysis import VoiceAnalyzer
+            await asyncio.to_thread(VoiceAnalyzer.preload)
+        except Exception as e:
+            logger.warning(f"librosa preload skipped: {e}")
+
     # Initialize Gemini-based services
     try:
         from app.core.scam_detector import get_classifier
-        get_classifier()
+        app.state.classifier = get_classifier()
         logger.info("Scam classifier initialized")
     except Exception as e:
         logger.error(f"Classifier initialization failed: {e}")
         raise
 
+    # Initialize remaining request-path services once, shared via app.state
+    from app.core.analysis_cache import get_analysis_cache
+    from app.core.dataset_updater import get_dataset_updater
+    from app.core.honeypot import get_honeypot_agent
+    from app.core.ssf_engine import get_ssf_engine
+    from app.intelligence.voice_analysis import get_voice_analyzer
+
+    app.state.ssf_engine = get_ssf_engine()
+    app.state.honeypot_agent = get_honeypot_agent()
+    app.state.dataset_updater = get_dataset_updater()
+    app.state.voice_analyzer = get_voice_analyzer()
+    app.state.analysis_cache = get_analysis_cache()
+    logger.info("Analysis services initialized")
+
+    # Refresh the cached timestamp once per second
+    clock_task = asyncio.create_task(run_clock())
+
     logger.info("BlockSafe API ready to accept requests")
 
     yield  # Application runs here
 
     # Shutdown
     logger.info("BlockSafe API shutting down...")
+    clock_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await clock_task
+    await app.state.dataset_updater.aclose()
+    await close_genai_client()
 
 
 # Create FastAPI application
@@ -90,6 +126,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Reject oversized audio uploads before the multipart body is spooled
+app.add_middleware(AudioUploadLimitMiddleware)
+
 # CORS middleware (configure as needed for production)
 app.add_middleware(
     CORSMiddleware,
@@ -110,6 +149,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
             "detail": exc.detail,
             "type": "http_exception"
         },
+        headers=exc.headers,
     )
 
 
@@ -4,12 +4,13 @@ API key verification with secure comparison
 """
 
 import hmac
+from functools import lru_cache
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
-from app.config import Settings, get_settings
+from app.config import get_settings
 
 # API Key header scheme
 api_key_header = APIKeyHeader(
@@ -19,9 +20,15 @@ api_key_header = APIKeyHeader(
 )
 
 
+@lru_cache()
+def get_expected_key() -> bytes:
+    """Configured API key, encoded once for constant-time comparison"""
+    return get_settings().API_AUTH_KEY.get_secret_value().encode()
+
+
 def verify_api_key(
     api_key: Annotated[str, Security(api_key_header)],
-    settings: Annotated[Settings, Depends(get_settings)]
+    expected_key: Annotated[bytes, Depends(get_expected_key)]
 ) -> str:
     """
     Verify the API key from request header.
@@ -29,7 +36,7 @@ def verify_api_key(
 
     Args:
         api_key: The API key from X-API-KEY header
-        settings: Application settings
+        expected_key: The configured API key as bytes
 
     Returns:
         The verified API key
@@ -37,10 +44,8 @@ def verify_api_key(
     Raises:
         HTTPException: 401 if key is invalid
     """
-    expected_key = settings.API_AUTH_KEY.get_secret_value()
-
     # Constant-time comparison to prevent timing attacks
-    if not hmac.compare_digest(api_key.encode(), expected_key.encode()):
+    if not hmac.compare_digest(api_key.encode(), expected_key):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -3,16 +3,17 @@ BlockSafe Rate Limiting
 In-memory rate limiting for API protection
 """
 
+import math
 import time
 from typing import Dict, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from collections import defaultdict
 
 from fastapi import HTTPException, Request, status, Depends
 from app.security.auth import verify_api_key
 
 
-@dataclass
+@dataclass(slots=True)
 class RateLimitConfig:
     """Rate limit configuration"""
     requests_per_minute: int = 60
@@ -20,11 +21,14 @@ class RateLimitConfig:
     burst_limit: int = 10
 
 
-@dataclass
+@dataclass(slots=True)
 class RequestRecord:
     """Track requests for a client"""
-    minute_requests: list = field(default_factory=list)
-    hour_requests: list = field(default_factory=list)
+    minute_tokens: float = 0.0  # Token bucket for the per-minute limit
+    last_refill: float = float("-inf")  # Monotonic time of last refill (-inf = full bucket)
+    hour_window: int = -2  # Index of the current fixed hour window (monotonic hours)
+    hour_count: int = 0  # Requests in the current hour window
+    prev_hour_count: int = 0  # Requests in the previous hour window
 
 
 class RateLimiter:
@@ -37,17 +41,32 @@ class RateLimiter:
         self.config = config or RateLimitConfig()
         self._records: Dict[str, RequestRecord] = defaultdict(RequestRecord)
 
-    def _cleanup_old_requests(self, record: RequestRecord, now: float) -> None:
-        """Remove expired request timestamps"""
-        minute_ago = now - 60
-        hour_ago = now - 3600
+    def _refill(self, record: RequestRecord, now: float) -> None:
+        """Lazily refill the per-minute token bucket"""
+        capacity = self.config.requests_per_minute
+        elapsed = now - record.last_refill
+        record.minute_tokens = min(capacity, record.minute_tokens + elapsed * capacity / 60)
+        record.last_refill = now
+
+    def _roll_hour_window(self, record: RequestRecord, now: float) -> None:
+        """Advance the fixed hour windows to the one containing now"""
+        window = int(now // 3600)
+        if window != record.hour_window:
+            # Counts older than the previous window no longer matter
+            record.prev_hour_count = record.hour_count if window == record.hour_window + 1 else 0
+            record.hour_count = 0
+            record.hour_window = window
+
+    @staticmethod
+    def _hour_estimate(record: RequestRecord, now: float) -> float:
+        """
+        Approximate requests in the last hour (sliding window counter).
 
-        record.minute_requests = [
-            t for t in record.minute_requests if t > minute_ago
-        ]
-        record.hour_requests = [
-            t for t in record.hour_requests if t > hour_ago
-        ]
+        The previous window's count is weighted by how much of it still
+        overlaps the trailing hour, assuming its requests were evenly spread.
+        """
+        overlap = 1 - (now % 3600) / 3600
+        return record.prev_hour_count * overlap + record.hour_count
 
     def check_rate_limit(self, client_id: str) -> None:
         """
@@ -59,22 +78,24 @@ class RateLimiter:
         Raises:
             HTTPException: 429 if rate limit exceeded
         """
-        now = time.time()
+        now = time.monotonic()
         record = self._records[client_id]
 
-        # Cleanup old requests
-        self._cleanup_old_requests(record, now)
+        # Refill bucket and advance the hour windows
+        self._refill(record, now)
+        self._roll_hour_window(record, now)
 
-        # Check minute limit
-        if len(record.minute_requests) >= self.config.requests_per_minute:
+        # Check minute limit (token bucket refilling at requests_per_minute / 60 per second)
+        if record.minute_tokens < 1:
+            retry_after = math.ceil((1 - record.minute_tokens) * 60 / self.config.requests_per_minute)
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Max {self.config.requests_per_minute} requests per minute.",
-                headers={"Retry-After": "60"}
+                headers={"Retry-After": str(retry_after)}
             )
 
         # Check hour limit
-        if len(record.hour_requests) >= self.config.requests_per_hour:
+        if self._hour_estimate(record, now) >= self.config.requests_per_hour:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Max {self.config.requests_per_hour} requests per hour.",
@@ -82,30 +103,28 @@ class RateLimiter:
             )
 
         # Record this request
-        record.minute_requests.append(now)
-        record.hour_requests.append(now)
+        record.minute_tokens -= 1
+        record.hour_count += 1
 
     def get_remaining(self, client_id: str) -> Dict[str, int]:
         """Get remaining requests for a client"""
-        now = time.time()
+        now = time.monotonic()
         record = self._records[client_id]
-        self._cleanup_old_requests(record, now)
+        self._refill(record, now)
+        self._roll_hour_window(record, now)
 
         return {
-            "minute_remaining": max(0, self.config.requests_per_minute - len(record.minute_requests)),
-            "hour_remaining": max(0, self.config.requests_per_hour - len(record.hour_requests))
+            "minute_remaining": int(record.minute_tokens),
+            "hour_remaining": max(0, math.ceil(self.config.requests_per_hour - self._hour_estimate(record, now)))
         }
 
 
 # Global rate limiter instance
-_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter = RateLimiter()
 
 
 def get_rate_limiter() -> RateLimiter:
     """Get global rate limiter instance"""
-    global _rate_limiter
-    if _rate_limiter is None:
-        _rate_limiter = RateLimiter()
     return _rate_limiter
 
 
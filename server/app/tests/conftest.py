@@ -0,0 +1,51 @@
+"""
+BlockSafe Test Configuration
+Fixtures shared across test modules
+"""
+
+import os
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+# Set test environment variables BEFORE importing app modules
+os.environ["GEMINI_API_KEY"] = "test-gemini-api-key-12345"
+os.environ["API_AUTH_KEY"] = "test-auth-key-67890"
+os.environ["MAX_AUDIO_MB"] = "10"
+
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def mocked_gemini():
+    """Mocked Gemini client, built once; tests set generate_content's return_value"""
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+    return client
+
+
+@pytest.fixture(autouse=True)
+def reset_mocked_gemini(mocked_gemini):
+    """Clear calls and return values a test left on the shared Gemini mock"""
+    yield
+    mocked_gemini.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="session")
+def test_client(mocked_gemini):
+    """Create test client with mocked Gemini (app starts once per test run)"""
+    with patch('app.core.scam_detector.get_genai_client', return_value=mocked_gemini):
+        from app.main import app
+        with TestClient(app, raise_server_exceptions=False) as client:
+            yield client
+
+
+@pytest.fixture
+def valid_api_key():
+    """Return valid API key for tests"""
+    return "test-auth-key-67890"
+
+
+@pytest.fixture(scope="session")
+def oversized_audio():
+    """Upload one byte over a 1MB MAX_AUDIO_MB (allocated once per test run)"""
+    return b"0" * (1024 * 1024 + 1)
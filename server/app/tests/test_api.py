@@ -3,57 +3,30 @@ BlockSafe API Tests
 Comprehensive test suite for API endpoints and core functionality
 """
 
+import asyncio
 import os
 import sys
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from datetime import datetime, timezone
 
-# Set test environment variables BEFORE importing app modules
-os.environ["GEMINI_API_KEY"] = "test-gemini-api-key-12345"
-os.environ["API_AUTH_KEY"] = "test-auth-key-67890"
-os.environ["MAX_AUDIO_MB"] = "10"
-
-from fastapi.testclient import TestClient
+from pydantic import ValidationError
 
+from app.api.v1.schemas import AnalysisResponse, ExtractedEntities, SSFProfile, TextInput
 
 # =============================================================================
-# FIXTURES
+# SAMPLE MESSAGES
 # =============================================================================
 
-@pytest.fixture(scope="module")
-def test_client():
-    """Create test client with mocked Gemini"""
-    with patch('app.core.scam_detector.genai') as mock_genai:
-        # Mock the Gemini client
-        mock_client = MagicMock()
-        mock_genai.Client.return_value = mock_client
-
-        from app.main import app
-        client = TestClient(app, raise_server_exceptions=False)
-        yield client
-
-
-@pytest.fixture
-def valid_api_key():
-    """Return valid API key for tests"""
-    return "test-auth-key-67890"
-
-
-@pytest.fixture
-def scam_message():
-    """Sample scam message for testing"""
-    return """URGENT! Your SBI bank account has been blocked due to suspicious activity.
+# Sample scam message for testing
+SCAM_MESSAGE = """URGENT! Your SBI bank account has been blocked due to suspicious activity.
     Pay Rs. 5000 fine immediately to UPI: scammer@ybl
     Contact us on WhatsApp: 9876543210
     Click here: http://fake-bank.com/verify
     This is your FINAL WARNING!"""
 
-
-@pytest.fixture
-def legitimate_message():
-    """Sample legitimate message for testing"""
-    return "Thank you for your order #12345. Your package will arrive in 3-5 business days."
+# Sample legitimate message for testing
+LEGITIMATE_MESSAGE = "Thank you for your order #12345. Your package will arrive in 3-5 business days."
 
 
 # =============================================================================
@@ -113,13 +86,12 @@ class TestAuthentication:
         )
         assert response.status_code == 401
 
-    def test_valid_api_key_accepted(self, test_client, valid_api_key):
+    def test_valid_api_key_accepted(self, test_client, valid_api_key, mocked_gemini):
         """Request with valid API key should be accepted"""
-        with patch('app.core.scam_detector.ScamClassifier._client') as mock_client:
-            mock_response = MagicMock()
-            mock_response.text = '{"is_scam": false, "confidence": 0.1, "scam_type": null, "reasoning": "test"}'
-            mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
-
+        mocked_gemini.aio.models.generate_content.return_value = MagicMock(
+            text='{"is_scam": false, "confidence": 0.1, "scam_type": null, "reasoning": "test"}'
+        )
+        with patch('app.core.scam_detector.ScamClassifier._client', mocked_gemini):
             response = test_client.post(
                 "/api/v1/analyze/text",
                 json={"message": "Hello world"},
@@ -147,31 +119,21 @@ class TestTextAnalysisEndpoint:
 
     def test_mode_defaults_to_shield(self):
         """Mode should default to 'shield'"""
-        from app.api.v1.schemas import TextInput
-
         input_data = TextInput(message="test message")
         assert input_data.mode == "shield"
 
     def test_mode_accepts_honeypot(self):
         """Mode should accept 'honeypot' value"""
-        from app.api.v1.schemas import TextInput
-
         input_data = TextInput(message="test message", mode="honeypot")
         assert input_data.mode == "honeypot"
 
     def test_invalid_mode_rejected(self):
         """Invalid mode should be rejected"""
-        from app.api.v1.schemas import TextInput
-        from pydantic import ValidationError
-
         with pytest.raises(ValidationError):
             TextInput(message="test", mode="invalid")
 
     def test_message_max_length(self):
         """Message exceeding max length should be rejected"""
-        from app.api.v1.schemas import TextInput
-        from pydantic import ValidationError
-
         with pytest.raises(ValidationError):
             TextInput(message="x" * 10001)
 
@@ -193,18 +155,70 @@ class TestAudioAnalysisEndpoint:
         )
         assert response.status_code == 415
 
-    def test_oversized_file_returns_413(self, test_client, valid_api_key):
+    def test_oversized_file_returns_413(self, test_client, valid_api_key, oversized_audio):
         """File exceeding MAX_AUDIO_MB should return 413"""
-        # Create 11MB file (exceeds 10MB limit)
-        large_content = b"0" * (11 * 1024 * 1024)
+        from app.api.v1.routes import settings
 
-        response = test_client.post(
-            "/api/v1/analyze/audio",
-            files={"file": ("test.wav", large_content, "audio/wav")},
-            data={"mode": "shield"},
-            headers={"X-API-KEY": valid_api_key}
-        )
+        # Lower the limit to 1MB so the 1MB + 1 byte upload exceeds it
+        with patch.object(settings, "MAX_AUDIO_MB", 1):
+            response = test_client.post(
+                "/api/v1/analyze/audio",
+                files={"file": ("test.wav", oversized_audio, "audio/wav")},
+                data={"mode": "shield"},
+                headers={"X-API-KEY": valid_api_key}
+            )
+        assert response.status_code == 413
+
+    async def test_oversized_stream_is_cut_off_while_uploading(self):
+        """A chunked upload over MAX_AUDIO_MB should be rejected without reading the rest"""
+        from app.api.v1.errors import AudioFileTooLargeError
+        from app.api.v1.routes import settings
+        from app.api.v1.upload_limit import AUDIO_UPLOAD_PATH, AudioUploadLimitMiddleware
+
+        received = []
+
+        async def receive():
+            received.append(1)
+            return {"type": "http.request", "body": b"0" * (64 * 1024), "more_body": len(received) < 64}
+
+        async def read_body(scope, receive, send):
+            while (await receive()).get("more_body"):
+                pass
+
+        scope = {"type": "http", "path": AUDIO_UPLOAD_PATH, "headers": []}
+        with patch.object(settings, "MAX_AUDIO_MB", 1):
+            with pytest.raises(AudioFileTooLargeError):
+                await AudioUploadLimitMiddleware(read_body)(scope, receive, None)
+        assert len(received) < 64
+
+    def test_declared_oversized_body_returns_413(self, test_client, valid_api_key):
+        """A Content-Length over MAX_AUDIO_MB should be rejected before the body is parsed"""
+        from app.api.v1.routes import settings
+
+        from starlette.datastructures import UploadFile
+
+        with patch.object(settings, "MAX_AUDIO_MB", 1), \
+                patch.object(UploadFile, "write") as spool:
+            response = test_client.post(
+                "/api/v1/analyze/audio",
+                files={"file": ("test.wav", b"0" * (2 * 1024 * 1024), "audio/wav")},
+                data={"mode": "shield"},
+                headers={"X-API-KEY": valid_api_key}
+            )
         assert response.status_code == 413
+        spool.assert_not_called()
+
+    def test_busy_audio_workers_return_503(self, test_client, valid_api_key):
+        """Requests beyond MAX_AUDIO_CONCURRENCY should be rejected, not queued"""
+        with patch('app.api.v1.routes.get_audio_slots', return_value=asyncio.Semaphore(0)):
+            response = test_client.post(
+                "/api/v1/analyze/audio",
+                files={"file": ("test.wav", b"RIFF", "audio/wav")},
+                data={"mode": "shield"},
+                headers={"X-API-KEY": valid_api_key}
+            )
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
 
     def test_supported_audio_formats(self):
         """Verify all supported audio formats"""
@@ -223,10 +237,6 @@ class TestSchemas:
 
     def test_analysis_response_all_fields(self):
         """AnalysisResponse should have all required fields"""
-        from app.api.v1.schemas import (
-            AnalysisResponse, ExtractedEntities, SSFProfile
-        )
-
         response = AnalysisResponse(
             request_id="test-uuid",
             timestamp="2026-01-30T00:00:00Z",
@@ -248,9 +258,6 @@ class TestSchemas:
 
     def test_ssf_profile_urgency_score_bounds(self):
         """SSFProfile urgency_score should be bounded 0-1"""
-        from app.api.v1.schemas import SSFProfile
-        from pydantic import ValidationError
-
         # Valid scores
         SSFProfile(urgency_score=0.0, strategy_summary="test")
         SSFProfile(urgency_score=1.0, strategy_summary="test")
@@ -265,8 +272,6 @@ class TestSchemas:
 
     def test_extracted_entities_defaults(self):
         """ExtractedEntities should have empty list defaults"""
-        from app.api.v1.schemas import ExtractedEntities
-
         entities = ExtractedEntities()
         assert entities.upi_ids == []
         assert entities.bank_accounts == []
@@ -275,9 +280,6 @@ class TestSchemas:
 
     def test_evidence_level_values(self):
         """Evidence level should only accept valid values"""
-        from app.api.v1.schemas import AnalysisResponse, ExtractedEntities, SSFProfile
-        from pydantic import ValidationError
-
         valid_levels = ["NONE", "LOW", "MEDIUM", "HIGH"]
 
         for level in valid_levels:
@@ -296,6 +298,232 @@ class TestSchemas:
             assert response.evidence_level == level
 
 
+# =============================================================================
+# CLASSIFIER PRE-FILTER TESTS
+# =============================================================================
+
+class TestClassifierPrefilter:
+    """Tests for deterministic classification without a Gemini call"""
+
+    async def test_credential_request_skips_gemini(self, test_client, mocked_gemini):
+        """Requests for card credentials should be classified without Gemini"""
+        from app.core.scam_detector import get_classifier
+
+        with patch('app.core.scam_detector.ScamClassifier._client', mocked_gemini):
+            result = await get_classifier().classify(
+                "Your card is blocked. Share your card number and CVV to reactivate it."
+            )
+
+            assert result.is_scam is True
+            assert result.scam_type == "card_fraud"
+            mocked_gemini.aio.models.generate_content.assert_not_awaited()
+
+    async def test_credential_warning_goes_to_gemini(self, test_client, mocked_gemini):
+        """Warnings against sharing credentials should still be classified by Gemini"""
+        from app.core.scam_detector import get_classifier
+
+        mocked_gemini.aio.models.generate_content.return_value = MagicMock(
+            text='{"is_scam": false, "confidence": 0.1, "scam_type": null, "reasoning": "warning"}'
+        )
+        with patch('app.core.scam_detector.ScamClassifier._client', mocked_gemini):
+            result = await get_classifier().classify(
+                "Bank alert: never share your OTP or CVV with anyone, including bank staff."
+            )
+
+            assert result.is_scam is False
+            mocked_gemini.aio.models.generate_content.assert_awaited_once()
+
+    @pytest.mark.parametrize("message", [
+        "Enter OTP 482913 to log in to your HDFC NetBanking",
+        "We will send you an OTP to verify your number",
+        "Please enter the OTP sent to your phone to complete your Amazon order",
+        "Enter your OTP on the checkout page to confirm the payment",
+    ])
+    async def test_otp_delivery_goes_to_gemini(self, test_client, mocked_gemini, message):
+        """Ordinary OTP delivery messages should not be classified as scams without Gemini"""
+        from app.core.scam_detector import get_classifier
+
+        mocked_gemini.aio.models.generate_content.return_value = MagicMock(
+            text='{"is_scam": false, "confidence": 0.05, "scam_type": null, "reasoning": "otp"}'
+        )
+        with patch('app.core.scam_detector.ScamClassifier._client', mocked_gemini):
+            result = await get_classifier().classify(message)
+
+            assert result.is_scam is False
+            mocked_gemini.aio.models.generate_content.assert_awaited_once()
+
+
+# =============================================================================
+# HONEYPOT TESTS
+# =============================================================================
+
+class TestHoneypotRepetition:
+    """Tests for the repeated-scammer-message kill switch"""
+
+    def test_signature_is_stable_across_processes(self, test_client):
+        """Word bits come from crc32, not the per-process salted hash()"""
+        import zlib
+        from app.core.honeypot import WORD_BITSET_MASK, get_honeypot_agent
+
+        _, bits, count = get_honeypot_agent()._message_signature("Send OTP")
+        expected = (1 << (zlib.crc32(b"send") & WORD_BITSET_MASK)) | (1 << (zlib.crc32(b"otp") & WORD_BITSET_MASK))
+        assert (bits, count) == (expected, 2)
+
+    def test_more_than_80_percent_shared_words_is_repeated(self, test_client):
+        """Over 80% shared words ends the chat; exactly 80% does not"""
+        from app.core.honeypot import get_honeypot_agent
+
+        agent = get_honeypot_agent()
+        base = "please send the otp to verify your bank account today sir"
+        previous = [agent._message_signature(base)]
+
+        # 9 shared of 11 distinct words (82%)
+        nine = agent._message_signature("please send the otp to verify your bank account now")
+        assert agent._is_repeated_pattern(nine, previous) is True
+
+        # 4 shared of 5 distinct words (exactly 80%)
+        short_previous = [agent._message_signature("send the otp right away")]
+        four = agent._message_signature("send the otp right now")
+        assert agent._is_repeated_pattern(four, short_previous) is False
+
+        unrelated = agent._message_signature("which branch do you work at")
+        assert agent._is_repeated_pattern(unrelated, previous) is False
+
+
+# =============================================================================
+# PROMPT BATCHER TESTS
+# =============================================================================
+
+class TestPromptBatcher:
+    """Tests for the Gemini prompt micro-batcher"""
+
+    async def test_batched_answers_are_split_per_prompt(self):
+        """Prompts sent together should each get their own array element"""
+        import json
+        from app.core.prompt_batcher import PromptBatcher
+
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text='[{"a": 1}, {"b": 2}]'))
+        batcher = PromptBatcher(client, "model", 0.0, 64)
+
+        assert await batcher._generate(['first "TASK 2:" prompt', "second"]) == [{"a": 1}, {"b": 2}]
+        contents = client.aio.models.generate_content.await_args.kwargs["contents"]
+        # Each prompt is embedded as an escaped JSON string
+        assert json.dumps(['first "TASK 2:" prompt', "second"], indent=0) in contents
+
+    async def test_batched_answer_count_mismatch_raises(self):
+        """An array with the wrong number of answers should fail every prompt in the batch"""
+        from app.core.prompt_batcher import PromptBatcher
+
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text='[{"a": 1}]'))
+        batcher = PromptBatcher(client, "model", 0.0, 64)
+
+        with pytest.raises(ValueError):
+            await batcher._generate(["first", "second"])
+
+    async def test_aclose_fails_pending_prompts(self):
+        """Closing the batcher should fail prompts in flight instead of leaving them pending"""
+        import asyncio
+        from app.core.prompt_batcher import PromptBatcher
+
+        async def never_answers(prompts):
+            await asyncio.sleep(10)
+
+        batcher = PromptBatcher(MagicMock(), "model", 0.0, 64, max_wait=0.0)
+        with patch.object(batcher, '_generate', never_answers):
+            pending = asyncio.ensure_future(batcher.submit("prompt"))
+            await asyncio.sleep(0.01)
+            assert len(batcher._dispatches) == 1
+
+            await batcher.aclose()
+
+            with pytest.raises(RuntimeError):
+                await pending
+            assert not batcher._dispatches
+
+
+# =============================================================================
+# DATASET MANAGER TESTS
+# =============================================================================
+
+class TestDatasetManager:
+    """Tests for the scam pattern dataset index"""
+
+    def test_added_pattern_is_indexed_like_a_loaded_one(self, tmp_path):
+        """Patterns appended at runtime should match exactly as after a reload"""
+        import shutil
+        from app.core.dataset_manager import ScamDatasetManager
+
+        path = tmp_path / "scam_dataset.json"
+        shutil.copy(ScamDatasetManager().dataset_path, path)
+        manager = ScamDatasetManager(str(path))
+        assert manager.add_new_pattern({
+            "category": "Parcel Scam",
+            "scam_type": "Customs Fee Parcel",
+            "channels": ["SMS"],
+            "description": "Fake courier asks for a customs fee to release a parcel",
+            "common_keywords": ["parcel", "customs fee", "courier"],
+            "behavioral_patterns": ["Asks for upfront fee", "Creates urgency"],
+            "risk_level": "High"
+        })
+
+        message = "Your parcel is held at customs, pay the customs fee now via courier link"
+        reloaded = ScamDatasetManager(str(path))
+        added = [p.scam_id for p in manager.find_similar_patterns(message, threshold=0.2)]
+        assert added == [p.scam_id for p in reloaded.find_similar_patterns(message, threshold=0.2)]
+        assert manager.patterns[-1].scam_id in added
+
+
+# =============================================================================
+# SEMANTIC CACHE TESTS
+# =============================================================================
+
+class TestSemanticCache:
+    """Tests for the embedding-keyed semantic cache"""
+
+    async def test_persistent_entries_are_saved_on_close(self, tmp_path):
+        """Inserts should be written back once at close and restored on reopen"""
+        from app.core.semantic_cache import SemanticCache, embed_text
+
+        path = str(tmp_path / "cache")
+        cache = SemanticCache(capacity=8, path=path)
+        vector = embed_text("Your account is blocked, verify KYC now")
+        cache.insert(vector, ["bank_fraud", True])
+        assert not (tmp_path / "cache.json").exists()
+
+        await cache.aclose()
+
+        reopened = SemanticCache(capacity=8, path=path)
+        assert reopened.lookup(vector) == ["bank_fraud", True]
+
+
+# =============================================================================
+# RATE LIMIT TESTS
+# =============================================================================
+
+class TestRateLimiter:
+    """Tests for the in-memory rate limiter"""
+
+    def test_hour_limit_slides_across_windows(self):
+        """Previous-hour requests should count in proportion to their overlap"""
+        from fastapi import HTTPException
+        from app.security.rate_limit import RateLimiter, RateLimitConfig
+
+        limiter = RateLimiter(RateLimitConfig(requests_per_minute=10_000, requests_per_hour=4))
+        now = [7200.0]
+        with patch('app.security.rate_limit.time.monotonic', lambda: now[0]):
+            for _ in range(4):
+                limiter.check_rate_limit("client")
+            with pytest.raises(HTTPException) as exc:
+                limiter.check_rate_limit("client")
+            assert exc.value.status_code == 429
+
+            # Halfway through the next hour, half of the previous window still counts
+            now[0] = 7200.0 + 3600 + 1800
+            assert limiter.get_remaining("client")["hour_remaining"] == 2
+
+
 # =============================================================================
 # CONFIG TESTS
 # =============================================================================
@@ -314,7 +542,6 @@ class TestConfig:
     def test_max_audio_mb_validation(self):
         """MAX_AUDIO_MB should validate bounds"""
         from app.config import Settings
-        from pydantic import ValidationError
 
         # Valid values work
         os.environ["MAX_AUDIO_MB"] = "50"
@@ -18,9 +18,13 @@ from app.utils.helpers import (
     extract_all_entities,
     count_entities,
     merge_entities,
+    merge_entities_counted,
     sanitize_text,
+    sanitize_message,
+    normalize_message,
     ExtractedData
 )
+from app.utils.keyword_matcher import KeywordMatcher
 
 
 # =============================================================================
@@ -59,6 +63,17 @@ class TestUPIExtraction:
         result = extract_upi_ids("")
         assert result == []
 
+    def test_deduplicates_in_order_of_appearance(self):
+        """Repeated UPI IDs should be reported once, in first-seen order"""
+        result = extract_upi_ids("Pay c@ybl or a@paytm, again c@ybl, else b@okaxis")
+        assert result == ["c@ybl", "a@paytm", "b@okaxis"]
+
+    def test_long_username_runs_are_skipped(self):
+        """Long runs of username characters without a UPI ID are not reported"""
+        text = "a." * 5000 + " pay@ybl " + "x" * 100 + "@"
+        assert extract_upi_ids(text) == ["pay@ybl"]
+        assert normalize_message(text) == "a." * 5000 + " pay@ybl " + "x" * 100 + "@"
+
 
 # =============================================================================
 # BANK ACCOUNT EXTRACTION TESTS
@@ -93,6 +108,12 @@ class TestBankAccountExtraction:
         # Phone numbers starting with 9,8,7,6 should be filtered
         assert "9876543210" not in result
 
+    def test_accounts_are_ascii_digits(self):
+        """Accounts attached to non-Latin words are found; non-ASCII digits are not"""
+        text = "खाता123456789012 या खाता १२३४५६७८९०१२"
+        result = extract_bank_accounts(text)
+        assert result == ["123456789012"]
+
 
 # =============================================================================
 # URL EXTRACTION TESTS
@@ -196,6 +217,14 @@ class TestExtractAllEntities:
         result = extract_all_entities("Hello, how are you today?")
         assert count_entities(result) == 0
 
+    def test_repeated_text_returns_independent_results(self):
+        """Cached extraction should not leak mutations between calls"""
+        text = "Pay to scammer@ybl now"
+        first = extract_all_entities(text)
+        first.upi_ids.append("mutated@ybl")
+        second = extract_all_entities(text)
+        assert second.upi_ids == ["scammer@ybl"]
+
 
 # =============================================================================
 # ENTITY COUNT TESTS
@@ -267,6 +296,21 @@ class TestMergeEntities:
         result = merge_entities(data1, data2)
         assert len(result.upi_ids) == 1
 
+    def test_counted_merge_reports_new_entities(self):
+        """Should report only the entities the merge added"""
+        base = ExtractedData(upi_ids=["a@ybl"], bank_accounts=[], urls=[], phone_numbers=[])
+        new = ExtractedData(
+            upi_ids=["a@ybl", "b@paytm"],
+            bank_accounts=[],
+            urls=[],
+            phone_numbers=["9876543210"]
+        )
+
+        result, added = merge_entities_counted(base, new)
+        assert added == 2
+        assert count_entities(result) == 3
+        assert merge_entities_counted(result, new)[1] == 0
+
 
 # =============================================================================
 # SANITIZE TEXT TESTS
@@ -304,6 +348,60 @@ class TestSanitizeText:
         result = sanitize_text(None)
         assert result == ""
 
+    def test_sanitize_message_matches_sanitize_text(self):
+        """Should clean text exactly like sanitize_text"""
+        text = "Hi\x00 there\x07\n\tfriend\x7f" + "y" * 20000
+        cleaned, is_empty = sanitize_message(text)
+        assert cleaned == sanitize_text(text)
+        assert is_empty is False
+
+    def test_sanitize_message_flags_blank_input(self):
+        """Should flag input that is empty after cleaning"""
+        assert sanitize_message("")[1] is True
+        assert sanitize_message(" \x00\n\t\x1f ")[1] is True
+
+    def test_normalize_message_folds_variable_details(self):
+        """Messages differing only in case, spacing and numbers normalize alike"""
+        a = normalize_message("Pay Rs 500 to Scam@YBL  now: https://bit.ly/Ab1")
+        b = normalize_message("pay rs 12000 to scam@ybl now: https://bit.ly/Ab1 ")
+        assert a == b
+        assert a == "pay rs # to scam@ybl now: https://bit.ly/Ab1"
+
+    def test_normalize_message_keeps_links_and_payees(self):
+        """The same text with a different URL or UPI ID must not share a key"""
+        text = "Complete your KYC at {} or pay the fee to {}"
+        genuine = normalize_message(text.format("https://www.onlinesbi.sbi/kyc", "sbi@sbi"))
+        assert genuine != normalize_message(text.format("https://onlinesbi-kyc.co/kyc", "sbi@sbi"))
+        assert genuine != normalize_message(text.format("https://www.onlinesbi.sbi/kyc", "sbikyc1@ybl"))
+
+
+# =============================================================================
+# KEYWORD MATCHER TESTS
+# =============================================================================
+
+class TestKeywordMatcher:
+    """Tests for single-pass keyword matching"""
+
+    def test_finds_present_keywords(self):
+        """Should return only keywords present in the text"""
+        matcher = KeywordMatcher(["otp", "bank", "refund"])
+        assert matcher.find("share the otp with bank staff") == {"otp", "bank"}
+
+    def test_finds_overlapping_keywords(self):
+        """Should report keywords nested inside longer matches"""
+        matcher = KeywordMatcher(["verification code", "code", "cat", "cation"])
+        assert matcher.find("send verification code") == {"verification code", "code", "cation", "cat"}
+
+    def test_matches_substrings_like_in_operator(self):
+        """Should match inside words, like `keyword in text`"""
+        matcher = KeywordMatcher(["pin"])
+        assert matcher.find("shopping") == {"pin"}
+
+    def test_empty_inputs(self):
+        """Should handle empty keyword lists and empty text"""
+        assert KeywordMatcher([]).find("anything") == set()
+        assert KeywordMatcher(["otp"]).find("") == set()
+
 
 # =============================================================================
 # RUN TESTS
@@ -15,29 +15,28 @@ from app.intelligence.voice_analysis import VoiceSignals
 
 
 # =============================================================================
-# FIXTURES
+# SAMPLE MESSAGES
 # =============================================================================
 
-@pytest.fixture
-def ssf_engine():
-    """Create SSF engine instance"""
-    return SSFEngine()
-
-
-@pytest.fixture
-def scam_message():
-    """High-confidence scam message"""
-    return """URGENT! Your SBI bank account has been blocked due to suspicious activity.
+# High-confidence scam message
+SCAM_MESSAGE = """URGENT! Your SBI bank account has been blocked due to suspicious activity.
     This is the FINAL WARNING. Act now before midnight or face legal action.
     Pay Rs. 5000 fine immediately to UPI: scammer@ybl
     Contact us on WhatsApp: 9876543210
     Click here: http://fake-bank.com/verify"""
 
+# Legitimate message
+LEGITIMATE_MESSAGE = "Thank you for your order #12345. Your package will arrive in 3-5 business days."
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
 
 @pytest.fixture
-def legitimate_message():
-    """Legitimate message"""
-    return "Thank you for your order #12345. Your package will arrive in 3-5 business days."
+def ssf_engine():
+    """Create SSF engine instance"""
+    return SSFEngine()
 
 
 @pytest.fixture
@@ -97,14 +96,14 @@ class TestUrgencyDetection:
         result = ssf_engine.analyze("Your account will be blocked if you don't verify.")
         assert len(result.urgency_phrases) > 0
 
-    def test_low_urgency_for_legitimate(self, ssf_engine, legitimate_message):
+    def test_low_urgency_for_legitimate(self, ssf_engine):
         """Legitimate message should have low urgency"""
-        result = ssf_engine.analyze(legitimate_message)
+        result = ssf_engine.analyze(LEGITIMATE_MESSAGE)
         assert result.urgency_score < 0.3
 
-    def test_high_urgency_for_scam(self, ssf_engine, scam_message):
+    def test_high_urgency_for_scam(self, ssf_engine):
         """Scam message should have high urgency"""
-        result = ssf_engine.analyze(scam_message)
+        result = ssf_engine.analyze(SCAM_MESSAGE)
         assert result.urgency_score >= 0.3
 
 
@@ -145,9 +144,9 @@ class TestAuthorityClaimsDetection:
         result = ssf_engine.analyze("RBI and police have flagged your bank account.")
         assert len(result.authority_claims) >= 2
 
-    def test_no_authority_in_legitimate(self, ssf_engine, legitimate_message):
+    def test_no_authority_in_legitimate(self, ssf_engine):
         """Legitimate message should have no authority claims"""
-        result = ssf_engine.analyze(legitimate_message)
+        result = ssf_engine.analyze(LEGITIMATE_MESSAGE)
         assert len(result.authority_claims) == 0
 
 
@@ -173,9 +172,9 @@ class TestPaymentEscalationDetection:
         result = ssf_engine.analyze("Pay the fine of Rs. 10000 to avoid arrest.")
         assert result.payment_escalation is True
 
-    def test_no_payment_in_legitimate(self, ssf_engine, legitimate_message):
+    def test_no_payment_in_legitimate(self, ssf_engine):
         """Legitimate message should not have payment escalation"""
-        result = ssf_engine.analyze(legitimate_message)
+        result = ssf_engine.analyze(LEGITIMATE_MESSAGE)
         assert result.payment_escalation is False
 
 
@@ -206,9 +205,9 @@ class TestChannelSwitchDetection:
         result = ssf_engine.analyze("Click here to visit our website and verify.")
         assert result.channel_switch_intent == "Website"
 
-    def test_no_channel_switch_in_legitimate(self, ssf_engine, legitimate_message):
+    def test_no_channel_switch_in_legitimate(self, ssf_engine):
         """Legitimate message should not have channel switch"""
-        result = ssf_engine.analyze(legitimate_message)
+        result = ssf_engine.analyze(LEGITIMATE_MESSAGE)
         assert result.channel_switch_intent is None
 
 
@@ -260,15 +259,15 @@ class TestVoiceSignalIntegration:
 class TestStrategySummary:
     """Tests for strategy summary generation"""
 
-    def test_generates_summary_for_scam(self, ssf_engine, scam_message):
+    def test_generates_summary_for_scam(self, ssf_engine):
         """Should generate meaningful summary for scam"""
-        result = ssf_engine.analyze(scam_message)
+        result = ssf_engine.analyze(SCAM_MESSAGE)
         assert len(result.strategy_summary) > 0
         assert result.strategy_summary != "No significant scam strategy patterns detected"
 
-    def test_generates_default_for_legitimate(self, ssf_engine, legitimate_message):
+    def test_generates_default_for_legitimate(self, ssf_engine):
         """Should generate default summary for legitimate message"""
-        result = ssf_engine.analyze(legitimate_message)
+        result = ssf_engine.analyze(LEGITIMATE_MESSAGE)
         assert "No significant" in result.strategy_summary or result.strategy_summary == ""
 
     def test_summary_mentions_authority(self, ssf_engine):
@@ -330,6 +329,39 @@ class TestEdgeCases:
 
         assert len(result.urgency_phrases) <= 10
 
+    def test_optional_suffixes_and_non_ascii(self, ssf_engine):
+        """Word gating should still catch suffixed forms and non-ASCII text"""
+        result = ssf_engine.analyze("Payment via PhonePe, it expires today. Reply on WhatsApp ✅")
+
+        assert result.payment_escalation is True
+        assert "expires today" in result.urgency_phrases
+        assert result.channel_switch_intent == "WhatsApp"
+
+    def test_ignorecase_folded_letters_in_non_ascii_text(self, ssf_engine):
+        """Letters re.IGNORECASE folds onto ASCII ('ſ' -> 's') should still match"""
+        result = ssf_engine.analyze("आपका खाता बंद है। Pay the pending g\u017fT fine today")
+
+        assert "Government" in result.authority_claims
+        assert result.payment_escalation is True
+
+    def test_repeated_text_returns_independent_results(self, ssf_engine):
+        """Cached text analysis should not leak mutations between calls"""
+        first = ssf_engine.analyze(SCAM_MESSAGE)
+        first.authority_claims.append("Mutated")
+        second = ssf_engine.analyze(SCAM_MESSAGE)
+
+        assert "Mutated" not in second.authority_claims
+        assert second.urgency_phrases == first.urgency_phrases
+
+    def test_batch_matches_individual_analysis(self, ssf_engine):
+        """analyze_batch should equal per-message analyze, with independent results"""
+        texts = [SCAM_MESSAGE, LEGITIMATE_MESSAGE, SCAM_MESSAGE]
+        results = ssf_engine.analyze_batch(texts)
+
+        assert results == [ssf_engine.analyze(text) for text in texts]
+        results[0].authority_claims.append("Mutated")
+        assert "Mutated" not in results[2].authority_claims
+
 
 # =============================================================================
 # SSF RESULT DATACLASS TESTS
@@ -0,0 +1,68 @@
+"""
+BlockSafe Clock Utilities
+Cached ISO-8601 timestamps refreshed by a background task
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Tuple
+
+
+_now_iso: str = datetime.now(timezone.utc).isoformat()
+_ticking = False
+
+# (epoch milliseconds, formatted timestamp) of the last now_iso_ms() call
+_ms_cache: Tuple[int, str] = (0, "")
+
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO-8601 string.
+
+    Returns the cached value (refreshed every second) while the clock task
+    is running, and formats the time directly otherwise.
+
+    Returns:
+        ISO-8601 timestamp
+    """
+    if _ticking:
+        return _now_iso
+    return datetime.now(timezone.utc).isoformat()
+
+
+def now_iso_ms() -> str:
+    """
+    Get the current UTC time as an ISO-8601 string at millisecond resolution.
+
+    The string is formatted at most once per millisecond, so a burst of
+    requests shares one datetime allocation.
+
+    Returns:
+        ISO-8601 timestamp
+    """
+    global _ms_cache
+    ms = time.time_ns() // 1_000_000
+    if ms != _ms_cache[0]:
+        _ms_cache = (
+            ms,
+            datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+        )
+    return _ms_cache[1]
+
+
+async def run_clock(interval: float = 1.0) -> None:
+    """
+    Refresh the cached timestamp until cancelled.
+
+    Args:
+        interval: Seconds between refreshes
+    """
+    global _now_iso, _ticking
+    _ticking = True
+    try:
+        while True:
+            _now_iso = datetime.now(timezone.utc).isoformat()
+            await asyncio.sleep(interval)
+    finally:
+        _ticking = False
@@ -0,0 +1,50 @@
+"""
+BlockSafe ID Utilities
+Fast, time-ordered request identifiers
+"""
+
+import itertools
+import os
+import time
+
+
+# Per-process node id and counter, drawn so IDs stay unique across workers
+_NODE_ID = os.urandom(5).hex()
+
+_counter = itertools.count()
+
+
+def _reseed() -> None:
+    """Draw a fresh node id and counter (workers forked after import share the parent's)"""
+    global _NODE_ID, _counter
+    _NODE_ID = os.urandom(5).hex()
+    _counter = itertools.count()
+
+
+os.register_at_fork(after_in_child=_reseed)
+
+
+def new_request_id() -> str:
+    """
+    Generate a 32-character time-ordered request ID.
+
+    Layout (hex): 48-bit millisecond timestamp | 40-bit process node id | 40-bit counter.
+    IDs sort by creation time and need no OS entropy per call.
+
+    Returns:
+        Lowercase hex ID
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{_NODE_ID}{next(_counter) & 0xFFFFFFFFFF:010x}"
+
+
+def new_session_id() -> str:
+    """
+    Generate a random 32-character session ID.
+
+    Session IDs are handed to clients and echoed back, so they stay
+    unguessable: 128 bits from os.urandom, hex-encoded (no UUID object).
+
+    Returns:
+        Lowercase hex ID
+    """
+    return os.urandom(16).hex()
@@ -0,0 +1,51 @@
+"""
+BlockSafe Keyword Matcher
+Single-pass multi-keyword substring matching
+"""
+
+import re
+from typing import Iterable, Optional
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text.
+
+    Equivalent to evaluating `keyword in text` for every keyword, but all
+    keywords are compiled into one alternation and the text is scanned once.
+    Matching is case-sensitive; lowercase both keywords and text for
+    case-insensitive lookups.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        unique = sorted({kw for kw in keywords if kw}, key=len, reverse=True)
+        self.keywords: frozenset[str] = frozenset(unique)
+
+        # A lookahead reports the longest keyword starting at each position;
+        # keywords that are substrings of a reported one are implied by it.
+        self._implied: dict[str, frozenset[str]] = {
+            kw: frozenset(other for other in unique if other != kw and other in kw)
+            for kw in unique
+        }
+        self._pattern: Optional[re.Pattern] = (
+            re.compile("(?=(" + "|".join(map(re.escape, unique)) + "))")
+            if unique else None
+        )
+
+    def find(self, text: str) -> set[str]:
+        """
+        Return the set of keywords that occur in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of matched keywords
+        """
+        if self._pattern is None or not text:
+            return set()
+
+        hits = {match.group(1) for match in self._pattern.finditer(text)}
+        for kw in list(hits):
+            hits |= self._implied[kw]
+        return hits
@@ -47,22 +47,22 @@ logger = setup_logger()
 
 def log_request(request_id: str, endpoint: str, mode: str) -> None:
     """Log incoming request"""
-    logger.info(f"Request {request_id} | Endpoint: {endpoint} | Mode: {mode}")
+    logger.info("Request %s | Endpoint: %s | Mode: %s", request_id, endpoint, mode)
 
 
 def log_classification(request_id: str, is_scam: bool, confidence: float, scam_type: Optional[str]) -> None:
     """Log classification result"""
     logger.info(
-        f"Classification {request_id} | is_scam: {is_scam} | "
-        f"confidence: {confidence:.2f} | type: {scam_type or 'N/A'}"
+        "Classification %s | is_scam: %s | confidence: %.2f | type: %s",
+        request_id, is_scam, confidence, scam_type or 'N/A'
     )
 
 
 def log_honeypot(request_id: str, turns: int, reason: str) -> None:
     """Log honeypot engagement"""
-    logger.info(f"Honeypot {request_id} | Turns: {turns} | Termination: {reason}")
+    logger.info("Honeypot %s | Turns: %s | Termination: %s", request_id, turns, reason)
 
 
 def log_error(request_id: str, error: str) -> None:
     """Log error"""
-    logger.error(f"Error {request_id} | {error}")
+    logger.error("Error %s | %s", request_id, error)